@@ -8,6 +8,8 @@ class Config(BaseSettings):
     
     alerting_endpoint: str
 
+    banword_matcher_cache_size: int = 128
+
     database: DatabaseConfig
 
 
@@ -1,8 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 
 class Vault(BaseModel):
     ignoring_banwords_input: List
     ignoring_banwords_output: List
     max_allowed_banwords_input: int
-    max_allowed_banwords_output: int
\ No newline at end of file
+    max_allowed_banwords_output: int
+    use_token_lookup: bool = False
+    use_normalization: bool = False
+    max_edit_distance: int = Field(default=0, ge=0, le=2)
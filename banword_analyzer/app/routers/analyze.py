@@ -6,7 +6,7 @@ from models.product import Product
 from routers import verify_api_key
 
 from schemas.analyze import InputRequest, OutputRequest, OutputResponse
-from services.analyzer import Analyzer
+from services.analyzer import analyzers_service
 from services.vault_manager import Vault, vault_manager
 from services.alert_service import AlertingService
 from core.config import main_config
@@ -14,8 +14,6 @@ from schemas.alert import Alert
 
 monitoring_router = APIRouter(prefix="/analyze")
 
-analyzers_service = Analyzer()
-
 alert_service = AlertingService(endpoint=main_config.alerting_endpoint)
 
 
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, status
 from models.product import Product
 from routers import verify_api_key
 from schemas.vault import VaultExample
+from services.analyzer import analyzers_service
 from services.vault_manager import Vault, vault_manager
 
 manager_router = APIRouter(prefix="/manager")
@@ -14,6 +15,7 @@ async def add_vault(
     vault: Vault,
     product: Product = Depends(verify_api_key),
 ):
+    analyzers_service.prepare_vault(vault)
     vault_manager.add_vault(product.product_id, vault)
 
 
@@ -11,6 +11,9 @@ class Analyzer:
     ) -> None:
         self.model = BanwordModel()
 
+    def prepare_vault(self, vault: Vault):
+        self.model.prepare_vault(vault)
+
     def analyze_input(self, text: str, vault: Vault) -> ModelResult:
         model_output = self.model.input_score(text, vault)
         sleep(1)
@@ -22,3 +25,6 @@ class Analyzer:
         sleep(1)
 
         return model_output
+
+
+analyzers_service = Analyzer()
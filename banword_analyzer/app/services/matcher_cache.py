@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, Tuple
+
+from utils.aho_corasick import AhoCorasick
+from utils.dictionary_artifact import DictionaryArtifact
+from utils.symspell import DeletionIndex, FuzzyMatcher
+from utils.text_normalizer import NormalizedMatcher
+from utils.token_matcher import TokenMatcher
+
+Matcher = AhoCorasick | TokenMatcher | NormalizedMatcher | FuzzyMatcher
+
+
+class MatcherCache:
+    """
+    Ограниченный LRU-кэш скомпилированных автоматов банвордов.
+    Ключ — версия словаря, режим поиска и набор игнорируемых слов, поэтому разные продукты не меняют общее состояние.
+    """
+
+    def __init__(self, dictionary: DictionaryArtifact, max_size: int) -> None:
+        self.dictionary = dictionary
+        self.banwords = frozenset(dictionary.banwords)
+        self.version = dictionary.version
+        self.max_size = max_size
+        self.matchers: OrderedDict[Tuple[str, int, bool, bool, frozenset], Matcher] = OrderedDict()
+        self.deletion_indexes: Dict[int, DeletionIndex] = dict()
+        self.lock = Lock()
+
+    def get_matcher(
+        self,
+        ignoring_banwords: Iterable[str],
+        use_token_lookup: bool = False,
+        use_normalization: bool = False,
+        max_edit_distance: int = 0,
+    ) -> Matcher:
+        """
+        Получение автомата для словаря без игнорируемых слов. При отсутствии в кэше автомат строится и
+        добавляется в кэш, самый давно использованный автомат вытесняется.
+        :param ignoring_banwords: Iterable[str]. Банворды, которые необходимо игнорировать
+        :param use_token_lookup: bool. Искать словоформы по границам токенов вместо поиска подстрок
+        :param use_normalization: bool. Искать подстроки в тексте, очищенном от обфускации.
+            Не применяется при поиске по токенам
+        :param max_edit_distance: int. Если больше 0, токены сравниваются с банвордами нечетко,
+            остальные режимы при этом не применяются
+        :returns: Matcher. Скомпилированный автомат
+        """
+        key = self.get_key(ignoring_banwords, use_token_lookup, use_normalization, max_edit_distance)
+
+        with self.lock:
+            matcher = self.matchers.get(key)
+            if matcher is not None:
+                self.matchers.move_to_end(key)
+                return matcher
+
+        matcher = self.build_matcher(*key[1:])
+
+        with self.lock:
+            self.matchers[key] = matcher
+            self.matchers.move_to_end(key)
+            while len(self.matchers) > self.max_size:
+                self.matchers.popitem(last=False)
+
+        return matcher
+
+    def get_key(
+        self,
+        ignoring_banwords: Iterable[str],
+        use_token_lookup: bool,
+        use_normalization: bool,
+        max_edit_distance: int,
+    ) -> Tuple[str, int, bool, bool, frozenset]:
+        """
+        Ключ кэша: неприменимые в выбранном режиме флаги сбрасываются, чтобы одинаковые автоматы
+        не строились дважды.
+        """
+        ignoring_banwords = frozenset(word.strip().lower() for word in ignoring_banwords)
+        if max_edit_distance:
+            use_token_lookup, use_normalization = False, False
+        if use_token_lookup:
+            use_normalization = False
+        else:
+            ignoring_banwords &= self.banwords
+        return self.version, max_edit_distance, use_token_lookup, use_normalization, ignoring_banwords
+
+    def build_matcher(
+        self, max_edit_distance: int, use_token_lookup: bool, use_normalization: bool, ignoring_banwords: frozenset
+    ) -> Matcher:
+        if max_edit_distance:
+            return FuzzyMatcher(self.get_deletion_index(max_edit_distance), ignoring_banwords)
+        if use_token_lookup:
+            return TokenMatcher(self.dictionary, ignoring_banwords)
+        if use_normalization:
+            return NormalizedMatcher(self.banwords - ignoring_banwords)
+        return AhoCorasick(self.banwords - ignoring_banwords)
+
+    def get_deletion_index(self, max_edit_distance: int) -> DeletionIndex:
+        """
+        Индекс удалений строится один раз на каждое расстояние и разделяется всеми сейфами.
+        :param max_edit_distance: int. Максимальное расстояние редактирования
+        :returns: DeletionIndex. Индекс удалений по словарю
+        """
+        with self.lock:
+            index = self.deletion_indexes.get(max_edit_distance)
+            if index is None:
+                index = DeletionIndex(self.banwords, max_edit_distance)
+                self.deletion_indexes[max_edit_distance] = index
+        return index
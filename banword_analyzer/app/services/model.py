@@ -1,8 +1,9 @@
 from models.vault import Vault
 from schemas.model_result import ModelResult, Reason
-import re
 from typing import List, Tuple
-from core.config import PROJECT_PATH
+from core.config import PROJECT_PATH, main_config
+from services.matcher_cache import Matcher, MatcherCache
+from utils.dictionary_artifact import load_dictionary_artifact
 
 
 class BanwordModel:
@@ -11,15 +12,25 @@ class BanwordModel:
     Если найдена подстрока, содержащая Base64-код, возвращает скор 1 и список кортежей (позиции начала и конца подстроки, 1).
     """
     def __init__(self):
-        with open(PROJECT_PATH / "data" / "swearwords.txt", "r") as f:
-            self.swear_words = set([line.strip().lower() for line in f.readlines()])
-        with open(PROJECT_PATH / "data" / "narcowords.txt", "r") as f:
-            self.narco_words = set([line.strip().lower() for line in f.readlines()])
-        self.banwords = self.swear_words | self.narco_words
+        self.dictionary = load_dictionary_artifact(PROJECT_PATH / "data")
+        self.matchers = MatcherCache(self.dictionary, max_size=main_config.banword_matcher_cache_size)
+
+    def prepare_vault(self, vault: Vault):
+        """
+        Предварительная компиляция автоматов для списков игнорируемых слов сейфа.
+        """
+        self.matchers.get_matcher(
+            vault.ignoring_banwords_input, vault.use_token_lookup, vault.use_normalization, vault.max_edit_distance
+        )
+        self.matchers.get_matcher(
+            vault.ignoring_banwords_output, vault.use_token_lookup, vault.use_normalization, vault.max_edit_distance
+        )
     
     def input_score(self, text: str, vault: Vault) -> ModelResult:
-        self.banwords -= set(vault.ignoring_banwords_input)
-        metric, reasons = self.detect_banwords(text)
+        matcher = self.matchers.get_matcher(
+            vault.ignoring_banwords_input, vault.use_token_lookup, vault.use_normalization, vault.max_edit_distance
+        )
+        metric, reasons = self.detect_banwords(text, matcher)
         reject_flg = metric > vault.max_allowed_banwords_input
 
         model_output = ModelResult(
@@ -29,8 +40,10 @@ class BanwordModel:
         return model_output
 
     def output_score(self, text: str, vault: Vault) -> ModelResult:
-        self.banwords -= set(vault.ignoring_banwords_output)
-        metric, reasons = self.detect_banwords(text)
+        matcher = self.matchers.get_matcher(
+            vault.ignoring_banwords_output, vault.use_token_lookup, vault.use_normalization, vault.max_edit_distance
+        )
+        metric, reasons = self.detect_banwords(text, matcher)
         reject_flg = metric > vault.max_allowed_banwords_output
 
         model_output = ModelResult(
@@ -38,16 +51,12 @@ class BanwordModel:
         )
 
         return model_output
-    
-    def detect_banwords(self, input: str) -> Tuple[float, List[Reason]]:
+
+    def detect_banwords(self, input: str, matcher: Matcher) -> Tuple[float, List[Reason]]:
         """
         Метод для определения инъекции на основе совпадения с банвордами.
         Возвращает скор (1, если найден хотя бы один банворд, иначе 0) и словарь с банвордами и их позициями.
         """
-        word_scores = []
-        for banword in self.banwords:
-            matches = list(re.finditer(re.escape(banword), input))
-            for match in matches:
-                word_scores.append(Reason(start=match.start(), stop=match.end()))
+        word_scores = [Reason(start=start, stop=stop) for start, stop, _ in matcher.iter_matches(input)]
 
         return len(word_scores), word_scores
\ No newline at end of file
@@ -0,0 +1,74 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """
+    Автомат Ахо-Корасик для одновременного поиска множества подстрок за один проход по тексту.
+    Автомат строится один раз по словарю, после чего поиск занимает O(len(text) + количество совпадений).
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = sorted({pattern for pattern in patterns if pattern})
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Tuple[int, ...]] = [()]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            self._add_pattern(pattern_id, pattern)
+        self._build_fail_links()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _add_pattern(self, pattern_id: int, pattern: str):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            state = next_state
+        self.output[state] += (pattern_id,)
+
+    def _build_fail_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail_state = self.fail[state]
+                while fail_state and char not in self.goto[fail_state]:
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.goto[fail_state].get(char, 0)
+                # Выходы суффиксных состояний сливаются заранее, чтобы при поиске не ходить по fail-ссылкам
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Поиск всех вхождений словаря в тексте за один проход.
+        Для каждого слова вхождения не пересекаются, как у re.finditer.
+        :param text: str. Текст для поиска
+        :returns: Iterator[Tuple[int, int, str]]. Кортежи (начало, конец, найденное слово)
+        """
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        patterns = self.patterns
+        last_stop: Dict[int, int] = {}
+
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                pattern = patterns[pattern_id]
+                stop = position + 1
+                start = stop - len(pattern)
+                if start >= last_stop.get(pattern_id, 0):
+                    last_stop[pattern_id] = stop
+                    yield start, stop, pattern
@@ -0,0 +1,81 @@
+"""
+Замер скорости поиска банвордов автоматом Ахо-Корасик в сравнении с прежним циклом re.finditer по каждому
+банворду: `python utils/benchmark_matcher.py` из директории app. Перебираются длина текста и размер словаря,
+для каждой пары проверяется, что оба способа находят одни и те же вхождения.
+"""
+
+import random
+import re
+import time
+from typing import Callable, List, Set, Tuple
+
+from aho_corasick import AhoCorasick
+from dictionary_artifact import DATA_PATH, read_dictionary
+
+TEXT_LENGTHS = (1_000, 10_000, 100_000)
+DICTIONARY_SIZES = (100, 500, None)  # None — весь словарь
+REPEATS = 3
+# Доля банвордов среди слов текста
+BANWORD_RATE = 0.02
+FILLER_WORDS = ("привет", "как", "дела", "сегодня", "хорошая", "погода", "мы", "идем", "гулять", "в", "парк")
+
+Span = Tuple[int, int]
+
+
+def make_text(banwords: List[str], length: int, rng: random.Random) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(banwords) if rng.random() < BANWORD_RATE else rng.choice(FILLER_WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def find_with_regex(banwords: List[str], text: str) -> Set[Span]:
+    spans = set()
+    for banword in banwords:
+        spans.update(match.span() for match in re.finditer(re.escape(banword), text))
+    return spans
+
+
+def find_with_automaton(automaton: AhoCorasick, text: str) -> Set[Span]:
+    return {(start, stop) for start, stop, _ in automaton.iter_matches(text)}
+
+
+def measure(find: Callable[[], Set[Span]]) -> Tuple[float, Set[Span]]:
+    """
+    Лучшее время из REPEATS запусков.
+    :param find: Callable[[], Set[Span]]. Поиск
+    :returns: Tuple[float, Set[Span]]. Время в секундах и найденные вхождения
+    """
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        spans = find()
+        best = min(best, time.perf_counter() - started)
+    return best, spans
+
+
+def main():
+    rng = random.Random(0)
+    dictionary = read_dictionary(DATA_PATH)
+    print(f"{'words':>6} {'chars':>8} {'build, ms':>10} {'automaton, ms':>14} {'regex, ms':>10} {'speedup':>8}")
+    for dictionary_size in DICTIONARY_SIZES:
+        banwords = rng.sample(dictionary, dictionary_size) if dictionary_size else dictionary
+        started = time.perf_counter()
+        automaton = AhoCorasick(banwords)
+        build_seconds = time.perf_counter() - started
+        for text_length in TEXT_LENGTHS:
+            text = make_text(banwords, text_length, rng)
+            automaton_seconds, automaton_spans = measure(lambda: find_with_automaton(automaton, text))
+            regex_seconds, regex_spans = measure(lambda: find_with_regex(banwords, text))
+            assert automaton_spans == regex_spans, "automaton and regex loop found different matches"
+            print(
+                f"{len(banwords):>6} {text_length:>8} {build_seconds * 1000:>10.1f} {automaton_seconds * 1000:>14.2f} "
+                f"{regex_seconds * 1000:>10.2f} {regex_seconds / automaton_seconds:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
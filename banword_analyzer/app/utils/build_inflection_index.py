@@ -0,0 +1,44 @@
+"""
+Офлайн-сборка таблицы словоформ банвордов: `python utils/build_inflection_index.py` из директории app.
+Требует pymorphy3 (requirements/dev.txt), в рантайме сервиса не используется.
+"""
+
+from typing import Dict, Iterable
+
+import pymorphy3
+from dictionary_artifact import DATA_PATH, INFLECTIONS_FILE_NAME, read_dictionary
+
+
+def build_inflection_index(banwords: Iterable[str]) -> Dict[str, str]:
+    """
+    Построение таблицы «словоформа -> банворд». Берется разбор, у которого слово является начальной формой,
+    иначе самый вероятный разбор.
+    Фразы из нескольких слов добавляются в таблицу как есть, у слов через дефис склоняется только последняя часть,
+    «ё» в словоформах заменяется на «е».
+    :param banwords: Iterable[str]. Банворды
+    :returns: Dict[str, str]. Таблица словоформ
+    """
+    morph = pymorphy3.MorphAnalyzer()
+    index = {}
+    for banword in banwords:
+        index.setdefault(banword.replace("ё", "е"), banword)
+        if " " in banword:
+            continue
+        prefix, _, word = banword.rpartition("-")
+        parses = morph.parse(word)
+        parse = next((parse for parse in parses if parse.normal_form == word), parses[0])
+        for form in parse.lexeme:
+            inflected = f"{prefix}-{form.word}" if prefix else form.word
+            index.setdefault(inflected.replace("ё", "е"), banword)
+    return index
+
+
+def main():
+    index = build_inflection_index(read_dictionary(DATA_PATH))
+    with open(DATA_PATH / INFLECTIONS_FILE_NAME, "w") as f:
+        for form, banword in sorted(index.items()):
+            f.write(f"{form}\t{banword}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Сборка и чтение бинарного артефакта словаря банвордов: `python utils/dictionary_artifact.py` из директории app.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data"
+INFLECTIONS_FILE_NAME = "inflections.tsv"
+ARTIFACT_FILE_NAME = "banwords.bin"
+
+MAGIC = b"BANWORDS"
+FORMAT_VERSION = 1
+# magic, версия формата, количество банвордов, количество словоформ, размер хэш-таблицы,
+# максимум слов во фразе, sha1 исходников
+HEADER = struct.Struct("<8sIIIII20s")
+
+
+def read_dictionary(data_path: Path) -> List[str]:
+    """
+    Чтение всех словарей банвордов из директории с данными.
+    :param data_path: Path. Директория со словарями *.txt
+    :returns: List[str]. Отсортированные уникальные банворды в нижнем регистре
+    """
+    banwords = set()
+    for dictionary_path in sorted(data_path.glob("*.txt")):
+        with open(dictionary_path, "r") as f:
+            banwords |= {line.strip().lower() for line in f.readlines() if line.strip()}
+    return sorted(banwords)
+
+
+def read_inflections(path: Path) -> Dict[str, str]:
+    """
+    Чтение таблицы словоформ, собранной utils/build_inflection_index.py.
+    :param path: Path. Путь к файлу inflections.tsv
+    :returns: Dict[str, str]. Таблица «словоформа -> банворд»
+    """
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return dict(line.rstrip("\n").split("\t", 1) for line in f if line.strip())
+
+
+def get_source_digest(data_path: Path) -> bytes:
+    """
+    Хэш исходных файлов словаря, по которому определяется версия артефакта.
+    :param data_path: Path. Директория с данными
+    :returns: bytes. sha1 исходников
+    """
+    digest = hashlib.sha1()
+    for source_path in sorted([*data_path.glob("*.txt"), data_path / INFLECTIONS_FILE_NAME]):
+        if source_path.exists():
+            digest.update(source_path.name.encode())
+            digest.update(source_path.read_bytes())
+    return digest.digest()
+
+
+def pack_strings(strings: List[bytes]) -> bytes:
+    offsets = array("I", [0])
+    for string in strings:
+        offsets.append(offsets[-1] + len(string))
+    return offsets.tobytes() + b"".join(strings)
+
+
+def build_hash_table(forms: List[bytes]) -> array:
+    """
+    Хэш-таблица с открытой адресацией: слот хранит номер словоформы + 1, 0 — пустой слот.
+    Используется crc32, так как встроенный hash() для строк различается между процессами.
+    """
+    table_size = 1
+    while table_size < 2 * len(forms):
+        table_size *= 2
+    table = array("I", bytes(4 * table_size))
+    for form_id, form in enumerate(forms):
+        slot = zlib.crc32(form) & (table_size - 1)
+        while table[slot]:
+            slot = (slot + 1) & (table_size - 1)
+        table[slot] = form_id + 1
+    return table
+
+
+def compile_dictionary(data_path: Path = DATA_PATH, artifact_path: Optional[Path] = None) -> Path:
+    """
+    Компиляция словарей *.txt и таблицы словоформ в бинарный артефакт. Словоформы ищутся
+    по хэш-таблице прямо в отображенном в память файле.
+    Файл записывается атомарно, чтобы параллельно стартующие воркеры не прочитали его частично.
+    :param data_path: Path. Директория с данными
+    :param artifact_path: Path | None. Путь к артефакту, по умолчанию data/banwords.bin
+    :returns: Path. Путь к артефакту
+    """
+    artifact_path = artifact_path or data_path / ARTIFACT_FILE_NAME
+    banwords = read_dictionary(data_path)
+    inflections = read_inflections(data_path / INFLECTIONS_FILE_NAME)
+    for banword in banwords:
+        inflections.setdefault(banword.replace("ё", "е"), banword)
+    inflections = {form: banword for form, banword in inflections.items() if banword in banwords}
+
+    banword_ids = {banword: banword_id for banword_id, banword in enumerate(banwords)}
+    forms = sorted(form.encode() for form in inflections)
+    form_banword_ids = array("I", [banword_ids[inflections[form.decode()]] for form in forms])
+    max_phrase_words = max((form.count(b" ") + 1 for form in forms), default=1)
+    hash_table = build_hash_table(forms)
+
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(banwords),
+        len(forms),
+        len(hash_table),
+        max_phrase_words,
+        get_source_digest(data_path),
+    )
+    tmp_path = artifact_path.with_name(f"{artifact_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(pack_strings([banword.encode() for banword in banwords]))
+        f.write(form_banword_ids.tobytes())
+        f.write(hash_table.tobytes())
+        f.write(pack_strings(forms))
+    os.replace(tmp_path, artifact_path)
+
+    return artifact_path
+
+
+class DictionaryArtifact:
+    """
+    Словарь банвордов, отображенный в память. Страницы файла разделяются всеми воркерами,
+    в памяти процесса декодируется только сам список банвордов.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            self.format_version,
+            banwords_count,
+            forms_count,
+            table_size,
+            self.max_phrase_words,
+            digest,
+        ) = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a banword dictionary artifact")
+        self.source_digest = digest
+        self.version = f"{self.format_version}-{digest.hex()}"
+
+        view = memoryview(self.buffer)
+        position = HEADER.size
+        banword_offsets, position = self._read_offsets(view, position, banwords_count)
+        self.banwords = [
+            bytes(view[position + banword_offsets[i] : position + banword_offsets[i + 1]]).decode()
+            for i in range(banwords_count)
+        ]
+        position += banword_offsets[banwords_count]
+
+        self.form_banword_ids = view[position : position + 4 * forms_count].cast("I")
+        position += 4 * forms_count
+        self.hash_table = view[position : position + 4 * table_size].cast("I")
+        self.table_mask = table_size - 1
+        position += 4 * table_size
+        self.form_offsets, self.forms_position = self._read_offsets(view, position, forms_count)
+
+    @staticmethod
+    def _read_offsets(view: memoryview, position: int, count: int) -> Tuple[memoryview, int]:
+        stop = position + 4 * (count + 1)
+        return view[position:stop].cast("I"), stop
+
+    def _form(self, form_id: int) -> bytes:
+        start = self.forms_position + self.form_offsets[form_id]
+        stop = self.forms_position + self.form_offsets[form_id + 1]
+        return self.buffer[start:stop]
+
+    def get(self, form: str) -> Optional[str]:
+        """
+        Поиск банворда по словоформе в хэш-таблице отображенного файла.
+        :param form: str. Словоформа в нижнем регистре
+        :returns: str | None. Банворд из словаря или None
+        """
+        key = form.encode()
+        slot = zlib.crc32(key) & self.table_mask
+        while self.hash_table[slot]:
+            form_id = self.hash_table[slot] - 1
+            if self._form(form_id) == key:
+                return self.banwords[self.form_banword_ids[form_id]]
+            slot = (slot + 1) & self.table_mask
+        return None
+
+
+def load_dictionary_artifact(data_path: Path = DATA_PATH) -> DictionaryArtifact:
+    """
+    Загрузка артефакта словаря. Если артефакт отсутствует, собран другой версией формата
+    или из других исходников, он пересобирается.
+    :param data_path: Path. Директория с данными
+    :returns: DictionaryArtifact. Словарь банвордов
+    """
+    artifact_path = data_path / ARTIFACT_FILE_NAME
+    if artifact_path.exists():
+        try:
+            artifact = DictionaryArtifact(artifact_path)
+        except (ValueError, struct.error):
+            artifact = None
+        is_current = artifact is not None and artifact.format_version == FORMAT_VERSION
+        if is_current and artifact.source_digest == get_source_digest(data_path):
+            return artifact
+    return DictionaryArtifact(compile_dictionary(data_path, artifact_path))
+
+
+if __name__ == "__main__":
+    compile_dictionary()
@@ -0,0 +1,108 @@
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, FrozenSet, Iterable, Iterator, Set, Tuple
+
+from utils.token_matcher import TOKEN_PATTERN
+
+# На каждые 5 символов банворда допускается одна ошибка, иначе короткие слова совпадают с обычными («бля» и «для»)
+CHARS_PER_EDIT = 5
+
+
+def get_deletes(word: str, max_edit_distance: int) -> Set[str]:
+    """
+    Все варианты слова, получаемые удалением не более max_edit_distance символов.
+    :param word: str. Слово
+    :param max_edit_distance: int. Максимальное количество удалений
+    :returns: Set[str]. Варианты слова, включая само слово
+    """
+    deletes = {word}
+    for distance in range(1, min(max_edit_distance, len(word)) + 1):
+        for positions in combinations(range(len(word)), distance):
+            deletes.add("".join(char for i, char in enumerate(word) if i not in positions))
+    return deletes
+
+
+def edit_distance(source: str, target: str, max_edit_distance: int) -> int:
+    """
+    Расстояние Дамерау-Левенштейна (optimal string alignment) с ранним выходом.
+    :param source: str. Первое слово
+    :param target: str. Второе слово
+    :param max_edit_distance: int. Порог, после которого точное значение не нужно
+    :returns: int. Расстояние или max_edit_distance + 1, если порог превышен
+    """
+    if abs(len(source) - len(target)) > max_edit_distance:
+        return max_edit_distance + 1
+
+    before_previous_row, previous_row = None, None
+    row = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        before_previous_row, previous_row, row = previous_row, row, [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = source[i - 1] != target[j - 1]
+            row[j] = min(row[j - 1] + 1, previous_row[j] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and source[i - 1] == target[j - 2] and source[i - 2] == target[j - 1]:
+                row[j] = min(row[j], before_previous_row[j - 2] + 1)
+        if min(row) > max_edit_distance:
+            return max_edit_distance + 1
+    return row[-1]
+
+
+class DeletionIndex:
+    """
+    Индекс симметричных удалений (SymSpell) по словарю банвордов. Строится один раз на максимальное
+    расстояние, поиск кандидатов для токена — несколько обращений к словарю вместо сравнения со всеми банвордами.
+    """
+
+    def __init__(self, banwords: Iterable[str], max_edit_distance: int):
+        self.max_edit_distance = max_edit_distance
+        self.max_length = 0
+        self.deletes: Dict[str, Tuple[str, ...]] = defaultdict(tuple)
+        for banword in banwords:
+            if " " in banword:
+                continue
+            self.max_length = max(self.max_length, len(banword))
+            allowed_distance = min(max_edit_distance, len(banword) // CHARS_PER_EDIT)
+            for delete in get_deletes(banword.replace("ё", "е"), allowed_distance):
+                self.deletes[delete] += (banword,)
+        self.deletes = dict(self.deletes)
+
+    def lookup(self, token: str) -> str | None:
+        """
+        Поиск ближайшего банворда для токена.
+        :param token: str. Токен в нижнем регистре
+        :returns: str | None. Ближайший банворд в пределах допустимого расстояния или None
+        """
+        if len(token) > self.max_length + self.max_edit_distance:
+            return None
+
+        best_banword, best_distance = None, self.max_edit_distance + 1
+        for delete in get_deletes(token, self.max_edit_distance):
+            for banword in self.deletes.get(delete, ()):
+                allowed_distance = min(self.max_edit_distance, len(banword) // CHARS_PER_EDIT)
+                distance = edit_distance(token, banword.replace("ё", "е"), allowed_distance)
+                if distance <= allowed_distance and distance < best_distance:
+                    best_banword, best_distance = banword, distance
+                    if distance == 0:
+                        return banword
+        return best_banword
+
+
+class FuzzyMatcher:
+    """
+    Нечеткий поиск банвордов по токенам текста с помощью индекса удалений.
+    """
+
+    def __init__(self, index: DeletionIndex, ignoring_banwords: FrozenSet[str] = frozenset()):
+        self.index = index
+        self.ignoring_banwords = ignoring_banwords
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Поиск токенов, отличающихся от банворда не более чем на допустимое расстояние.
+        :param text: str. Текст для поиска
+        :returns: Iterator[Tuple[int, int, str]]. Кортежи (начало, конец, банворд из словаря)
+        """
+        for match in TOKEN_PATTERN.finditer(text):
+            banword = self.index.lookup(match.group().lower().replace("ё", "е"))
+            if banword is not None and banword not in self.ignoring_banwords:
+                yield match.start(), match.end(), banword
@@ -0,0 +1,77 @@
+from array import array
+from typing import Iterable, Iterator, Tuple
+
+from utils.aho_corasick import AhoCorasick
+
+# Латинские омоглифы и leetspeak приводятся к кириллице, так как словарь банвордов в основном кириллический
+HOMOGLYPHS = str.maketrans(
+    {
+        "a": "а",
+        "b": "в",
+        "c": "с",
+        "e": "е",
+        "h": "н",
+        "k": "к",
+        "m": "м",
+        "n": "п",
+        "o": "о",
+        "p": "р",
+        "r": "г",
+        "t": "т",
+        "u": "и",
+        "x": "х",
+        "y": "у",
+        "ё": "е",
+        "0": "о",
+        "3": "з",
+        "4": "ч",
+        "6": "б",
+        "@": "а",
+    }
+)
+
+
+def normalize_text(text: str) -> Tuple[str, array]:
+    """
+    Нормализация текста за один проход: приведение к нижнему регистру и замена омоглифов,
+    удаление разделителей внутри слов, схлопывание повторяющихся букв и пробелов.
+    :param text: str. Исходный текст
+    :returns: Tuple[str, array]. Нормализованный текст и массив, где i-й элемент — позиция i-го символа
+        нормализованного текста в исходном тексте
+    """
+    chars = []
+    offsets = array("I")
+    previous = ""
+    for position, original in enumerate(text):
+        # lower() может вернуть несколько символов, поэтому приводится каждый символ отдельно
+        for char in original.lower().translate(HOMOGLYPHS):
+            if char.isspace():
+                char = " "
+            elif not char.isalnum():
+                continue
+            if char == previous:
+                continue
+            chars.append(char)
+            offsets.append(position)
+            previous = char
+    return "".join(chars), offsets
+
+
+class NormalizedMatcher:
+    """
+    Поиск банвордов в нормализованном тексте. Словарь нормализуется тем же способом,
+    найденные позиции переводятся обратно в позиции исходного текста.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.matcher = AhoCorasick(normalize_text(pattern)[0].strip() for pattern in patterns)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Поиск банвордов в тексте с учетом обфускации.
+        :param text: str. Исходный текст
+        :returns: Iterator[Tuple[int, int, str]]. Кортежи (начало, конец в исходном тексте, нормализованный банворд)
+        """
+        normalized, offsets = normalize_text(text)
+        for start, stop, pattern in self.matcher.iter_matches(normalized):
+            yield offsets[start], offsets[stop - 1] + 1, pattern
@@ -0,0 +1,44 @@
+import re
+from typing import FrozenSet, Iterator, Tuple
+
+from utils.dictionary_artifact import DictionaryArtifact
+
+TOKEN_PATTERN = re.compile(r"\w+(?:-\w+)*")
+
+
+class TokenMatcher:
+    """
+    Поиск банвордов по границам токенов: текст токенизируется один раз, каждый токен проверяется
+    поиском в хэш-таблице словоформ словаря. Стоимость пропорциональна количеству токенов, а не размеру словаря.
+    """
+
+    def __init__(self, index: DictionaryArtifact, ignoring_banwords: FrozenSet[str] = frozenset()):
+        self.index = index
+        self.ignoring_banwords = ignoring_banwords
+        self.max_phrase_words = index.max_phrase_words
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Поиск словоформ банвордов среди токенов текста. Фразы из нескольких слов сравниваются
+        с последовательностями токенов, приоритет у самой длинной фразы.
+        :param text: str. Текст для поиска
+        :returns: Iterator[Tuple[int, int, str]]. Кортежи (начало, конец, банворд из словаря)
+        """
+        tokens = [
+            (match.start(), match.end(), match.group().lower().replace("ё", "е"))
+            for match in TOKEN_PATTERN.finditer(text)
+        ]
+
+        position = 0
+        while position < len(tokens):
+            step = 1
+            for phrase_words in range(min(self.max_phrase_words, len(tokens) - position), 0, -1):
+                phrase_tokens = tokens[position : position + phrase_words]
+                form = " ".join(token for _, _, token in phrase_tokens)
+                banword = self.index.get(form)
+                if banword is None or banword in self.ignoring_banwords or form in self.ignoring_banwords:
+                    continue
+                yield phrase_tokens[0][0], phrase_tokens[-1][1], banword
+                step = phrase_words
+                break
+            position += step
@@ -1 +1,6 @@
+import os
+from pathlib import Path
+
 from core.config.config_loader import main_config
+
+PROJECT_PATH = Path(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "../../")))
@@ -8,6 +8,8 @@ class Config(BaseSettings):
     
     alerting_endpoint: str
 
+    decode_cache_max_bytes: int = 16 * 1024 * 1024
+
     database: DatabaseConfig
 
 
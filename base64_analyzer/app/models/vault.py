@@ -1,6 +1,33 @@
-from pydantic import BaseModel
+from typing import Tuple
+
+from pydantic import BaseModel, Field
+from utils.encodings import BASE32, BASE64, BASE64URL, HEX, PERCENT
 
 
 class Vault(BaseModel):
     max_base64_matches_input: int
-    max_base64_matches_output: int
\ No newline at end of file
+    max_base64_matches_output: int
+    # Словарь английских слов хранит слова от 8 символов, поэтому более короткие кандидаты не проверяются
+    min_encoded_length: int = Field(default=15, ge=8)
+    detect_base64: bool = True
+    detect_base64url: bool = False
+    detect_base32: bool = False
+    detect_hex: bool = False
+    detect_percent: bool = False
+    # Порог скора случайности (энтропия и классы символов) от 0 до 1, 0 — кандидаты не отсеиваются
+    min_candidate_score: float = Field(default=0.0, ge=0.0, le=1.0)
+    # Рекурсивное декодирование вложенных кодировок, 0 — выключено
+    max_decode_depth: int = Field(default=0, ge=0, le=8)
+    max_decoded_bytes: int = Field(default=1024 * 1024, gt=0)
+    decode_time_budget_ms: int = Field(default=50, gt=0)
+
+    @property
+    def enabled_encodings(self) -> Tuple[str, ...]:
+        flags = {
+            BASE64: self.detect_base64,
+            BASE64URL: self.detect_base64url,
+            BASE32: self.detect_base32,
+            HEX: self.detect_hex,
+            PERCENT: self.detect_percent,
+        }
+        return tuple(encoding for encoding, enabled in flags.items() if enabled)
@@ -7,6 +7,7 @@ class Reason(BaseModel):
     start: int
     stop: int
     additional_metric: float | None = None
+    encoding: str | None = None
 
 
 class ModelResult(BaseModel):
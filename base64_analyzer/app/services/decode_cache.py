@@ -0,0 +1,51 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+from core.config import main_config
+from utils.encodings import decode
+
+
+class DecodeCache:
+    """
+    LRU-кэш декодированных фрагментов по хэшу содержимого, ограниченный суммарным размером в байтах.
+    Фрагмент, повторяющийся внутри запроса или между запросами, декодируется один раз.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.fragments: OrderedDict[bytes, bytes | None] = OrderedDict()
+        self.lock = Lock()
+
+    def decode(self, encoding: str, fragment: str) -> bytes | None:
+        """
+        Декодирование фрагмента с использованием кэша.
+        :param encoding: str. Кодировка
+        :param fragment: str. Закодированная подстрока
+        :returns: bytes | None. Декодированные данные или None, если декодировать не удалось
+        """
+        key = hashlib.blake2b(f"{encoding}:{fragment}".encode(), digest_size=16).digest()
+
+        with self.lock:
+            if key in self.fragments:
+                self.fragments.move_to_end(key)
+                return self.fragments[key]
+
+        decoded = decode(encoding, fragment)
+        decoded_size = len(decoded) if decoded is not None else 0
+        if decoded_size > self.max_bytes:
+            return decoded
+
+        with self.lock:
+            if key not in self.fragments:
+                self.fragments[key] = decoded
+                self.size += decoded_size
+            while self.size > self.max_bytes:
+                _, evicted = self.fragments.popitem(last=False)
+                self.size -= len(evicted) if evicted is not None else 0
+
+        return decoded
+
+
+decode_cache = DecodeCache(max_bytes=main_config.decode_cache_max_bytes)
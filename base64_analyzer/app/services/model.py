@@ -1,20 +1,46 @@
 from models.vault import Vault
 from schemas.model_result import ModelResult, Reason
 import re
-import base64
-import binascii
-from typing import List, Tuple
-from nltk.corpus import words
-import nltk
-nltk.download('words')
+from typing import FrozenSet, Iterator, List, Tuple
+from core.config import PROJECT_PATH
+from services.decode_cache import decode_cache
+from utils.decode_budget import DecodeBudget
+from utils.encodings import BASE64URL, PERCENT, estimate_decoded_size, get_encodings_pattern
+from utils.build_vocabulary import VOCABULARY_FILE_NAME
+from utils.entropy import score_candidates
+
+
+def load_vocabulary() -> FrozenSet[str]:
+    """
+    Загрузка словаря английских слов, собранного utils/build_vocabulary.py при сборке образа.
+    Без словаря идентификаторы из английских слов принимались бы за закодированные подстроки,
+    поэтому его отсутствие — ошибка запуска, а не повод работать без фильтра.
+    :returns: FrozenSet[str]. Английские слова в нижнем регистре
+    """
+    path = PROJECT_PATH / "data" / VOCABULARY_FILE_NAME
+    if not path.exists():
+        raise FileNotFoundError(
+            f"English vocabulary {path} is missing, build it with `python utils/build_vocabulary.py` from app"
+        )
+    with open(path, "r") as f:
+        return frozenset(line.strip() for line in f if line.strip())
+
+
+# Загружается один раз при импорте модуля и дальше только читается
+ENGLISH_WORDS = load_vocabulary()
+MAX_WORD_LENGTH = max(map(len, ENGLISH_WORDS), default=0)
+
+# Идентификаторы вида snake_case и kebab-case выглядят как base64url, но состоят из обычных слов
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z]+(?:[_-][A-Za-z]+)*")
+
 
 class Base64Model:
     """
-    Анализатор для обнаружения Base64-кодированных подстрок.
-    Если найдена подстрока, содержащая Base64-код, возвращает скор 1 и список кортежей (позиции начала и конца подстроки, 1).
+    Анализатор для обнаружения закодированных подстрок: base64, base64url, base32, hex и percent-encoding.
+    Возвращает количество найденных подстрок и их позиции с указанием кодировки.
     """
     def input_score(self, text: str, vault: Vault) -> ModelResult:
-        metric, reasons = Base64Model.detect_base64_in_text(text)
+        metric, reasons = Base64Model.detect_encoded_in_text(text, vault)
         reject_flg = metric > vault.max_base64_matches_input
 
         model_output = ModelResult(
@@ -24,7 +50,7 @@ class Base64Model:
         return model_output
 
     def output_score(self, text: str, vault: Vault) -> ModelResult:
-        metric, reasons = Base64Model.detect_base64_in_text(text)
+        metric, reasons = Base64Model.detect_encoded_in_text(text, vault)
         reject_flg = metric > vault.max_base64_matches_output
 
         model_output = ModelResult(
@@ -34,30 +60,86 @@ class Base64Model:
         return model_output
     
     @staticmethod
-    def detect_base64_in_text(input: str) -> Tuple[float, List[Reason]]:
+    def iter_encoded(input: str, vault: Vault) -> Iterator[re.Match]:
         """
-        Метод для определения наличия Base64-кодированных подстрок в тексте.
-        Возвращает скор 1, если Base64-код найден, и список кортежей (позиция начала и конца подстроки, 1).
+        Поиск закодированных подстрок за один проход по тексту.
+        Кодировка совпадения доступна как match.lastgroup.
         """
-        # Регулярное выражение для поиска кандидатов на Base64
-        # Ищем последовательности длиннее 15 символов, состоящие из символов, допустимых в Base64
-        base64_pattern = r'[A-Za-z0-9+/=]{15,}'
+        if not vault.enabled_encodings:
+            return
+        pattern = get_encodings_pattern(vault.enabled_encodings, vault.min_encoded_length)
+
+        for match in pattern.finditer(input):
+            if not Base64Model.is_false_positive(match, vault):
+                yield match
 
-        potential_base64_matches = re.finditer(base64_pattern, input)
-        # Получим список всех известных английских слов
-        word_list = set(words.words())
+    @staticmethod
+    def is_false_positive(match: re.Match, vault: Vault) -> bool:
+        """
+        Кандидат, который не считается закодированной подстрокой: короткий percent-encoding,
+        английское слово или идентификатор из слов.
+        """
+        if match.lastgroup == PERCENT:
+            return match.end() - match.start() < vault.min_encoded_length
+        # Проверим, является ли эта последовательность существующим словом.
+        # Длинные кандидаты словами быть не могут, их подстрока не копируется
+        if match.end() - match.start() <= MAX_WORD_LENGTH and match.group().lower() in ENGLISH_WORDS:
+            return True
+        return match.lastgroup == BASE64URL and IDENTIFIER_PATTERN.fullmatch(match.group()) is not None
+
+    @staticmethod
+    def find_candidates(input: str, vault: Vault) -> List[re.Match]:
+        """
+        Закодированные подстроки, прошедшие порог скора случайности из сейфа.
+        Скоры считаются для всех кандидатов сразу, до какого-либо декодирования.
+        """
+        matches = list(Base64Model.iter_encoded(input, vault))
+        if not vault.min_candidate_score or not matches:
+            return matches
+
+        scores = score_candidates(input, [match.span() for match in matches], [match.lastgroup for match in matches])
+        return [match for match, score in zip(matches, scores) if score >= vault.min_candidate_score]
+
+    @staticmethod
+    def count_nested_layers(fragment: str, encoding: str, vault: Vault, budget: DecodeBudget, depth: int = 1) -> int:
+        """
+        Рекурсивное декодирование фрагмента в пределах бюджета запроса.
+        Возвращает количество слоев кодирования, включая сам фрагмент.
+        """
+        if depth > vault.max_decode_depth or not budget.allows(estimate_decoded_size(encoding, len(fragment))):
+            return 1
+
+        decoded = decode_cache.decode(encoding, fragment)
+        if decoded is None:
+            return 1
+        budget.consume(len(decoded))
+
+        try:
+            decoded_text = decoded.decode("utf-8")
+        except UnicodeDecodeError:
+            return 1
+
+        layers = 1
+        for match in Base64Model.find_candidates(decoded_text, vault):
+            nested_layers = Base64Model.count_nested_layers(match.group(), match.lastgroup, vault, budget, depth + 1)
+            layers = max(layers, 1 + nested_layers)
+        return layers
+
+    @staticmethod
+    def detect_encoded_in_text(input: str, vault: Vault) -> Tuple[float, List[Reason]]:
+        """
+        Метод для определения наличия закодированных подстрок в тексте за один проход по тексту.
+        Возвращает количество найденных подстрок и список Reason с позициями и кодировкой.
+        Если в сейфе включено рекурсивное декодирование, в additional_metric записывается количество слоев кодирования.
+        """
+        budget = DecodeBudget(vault.max_decoded_bytes, vault.decode_time_budget_ms)
 
         reasons = []
-        for match in potential_base64_matches:
-            candidate = match.group()
-
-            # Проверим, является ли эта последовательность существующим словом
-            if candidate.lower() in word_list:
-                continue
-
-            try:
-                decoded_data = base64.b64decode(candidate, validate=True)
-                reasons.append(Reason(start=match.start(), stop=match.end()))
-            except (binascii.Error, ValueError):
-                continue
+        for match in Base64Model.find_candidates(input, vault):
+            reason = Reason(start=match.start(), stop=match.end(), encoding=match.lastgroup)
+            if vault.max_decode_depth:
+                reason.additional_metric = Base64Model.count_nested_layers(
+                    match.group(), match.lastgroup, vault, budget
+                )
+            reasons.append(reason)
         return len(reasons), reasons
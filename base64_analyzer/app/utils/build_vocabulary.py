@@ -0,0 +1,33 @@
+"""
+Сборка словаря английских слов для Base64Model: `python utils/build_vocabulary.py` из директории app.
+Требует nltk (requirements/build.txt) и доступ к сети, запускается при сборке docker-образа,
+а не при старте сервиса.
+"""
+
+from pathlib import Path
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data"
+VOCABULARY_FILE_NAME = "english_words.txt"
+# Слова короче не могут быть кандидатами на Base64, поэтому в словарь не попадают
+MIN_WORD_LENGTH = 8
+
+
+def build_vocabulary(data_path: Path = DATA_PATH):
+    """
+    Загрузка корпуса слов nltk и запись словаря. nltk импортируется здесь: в рабочем образе его нет.
+    :param data_path: Path. Директория с данными
+    """
+    import nltk
+
+    if not nltk.download("words", quiet=True):
+        raise LookupError("nltk corpus 'words' could not be downloaded")
+    from nltk.corpus import words
+
+    vocabulary = sorted({word.lower() for word in words.words() if len(word) >= MIN_WORD_LENGTH})
+    data_path.mkdir(exist_ok=True)
+    with open(data_path / VOCABULARY_FILE_NAME, "w") as f:
+        f.write("\n".join(vocabulary) + "\n")
+
+
+if __name__ == "__main__":
+    build_vocabulary()
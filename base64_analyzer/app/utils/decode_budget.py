@@ -0,0 +1,17 @@
+from time import monotonic
+
+
+class DecodeBudget:
+    """
+    Бюджет рекурсивного декодирования одного запроса: суммарный объем декодированных байт и время.
+    """
+
+    def __init__(self, max_bytes: int, time_budget_ms: int) -> None:
+        self.remaining_bytes = max_bytes
+        self.deadline = monotonic() + time_budget_ms / 1000
+
+    def allows(self, size: int) -> bool:
+        return size <= self.remaining_bytes and monotonic() < self.deadline
+
+    def consume(self, size: int):
+        self.remaining_bytes -= size
@@ -0,0 +1,99 @@
+import base64
+import binascii
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
+from urllib.parse import unquote_to_bytes
+
+BASE64 = "base64"
+BASE64URL = "base64url"
+BASE32 = "base32"
+HEX = "hex"
+PERCENT = "percent"
+
+# Порядок важен: в одном месте текста срабатывает первая подходящая кодировка,
+# поэтому более узкие алфавиты проверяются раньше более широких
+ENCODINGS = (PERCENT, HEX, BASE32, BASE64, BASE64URL)
+
+# Корректность кандидата зашита в само выражение: если последовательность не является корректной строкой
+# в одной кодировке, движок переходит к следующей альтернативе в той же позиции.
+# Кандидат должен быть максимальной последовательностью символов своего алфавита (lookbehind/lookahead),
+# MIN_LENGTH заменяется на минимальную длину из сейфа
+ENCODING_PATTERNS = {
+    PERCENT: r"%[0-9A-Fa-f]{2}(?:[A-Za-z0-9._~!*'()+-]*%[0-9A-Fa-f]{2})*",
+    HEX: r"(?<![A-Za-z0-9+/=])(?=[0-9A-Fa-f]{MIN_LENGTH})(?:[0-9A-Fa-f]{2})+(?![A-Za-z0-9+/=])",
+    BASE32: (
+        r"(?<![A-Za-z0-9+/=])(?=[A-Z2-7=]{MIN_LENGTH})(?:[A-Z2-7]{8})*"
+        r"(?:[A-Z2-7]{8}|[A-Z2-7]{2}={6}|[A-Z2-7]{4}={4}|[A-Z2-7]{5}={3}|[A-Z2-7]{7}=)"
+        r"(?![A-Za-z0-9+/=])"
+    ),
+    BASE64: (
+        r"(?<![A-Za-z0-9+/=])(?=[A-Za-z0-9+/=]{MIN_LENGTH})(?:[A-Za-z0-9+/]{4})*"
+        r"(?:[A-Za-z0-9+/]{4}=*|[A-Za-z0-9+/]{2}==|[A-Za-z0-9+/]{3}=)"
+        r"(?![A-Za-z0-9+/=])"
+    ),
+    BASE64URL: (
+        r"(?<![A-Za-z0-9+/=_-])(?=[A-Za-z0-9_=-]{MIN_LENGTH})(?=[A-Za-z0-9]*[_-])"
+        r"(?:[A-Za-z0-9_-]{4})*(?:[A-Za-z0-9_-]{4}=*|[A-Za-z0-9_-]{2}(?:==)?|[A-Za-z0-9_-]{3}=?)"
+        r"(?![A-Za-z0-9+/=_-])"
+    ),
+}
+
+
+@lru_cache(maxsize=64)
+def get_encodings_pattern(encodings: Tuple[str, ...], min_length: int) -> re.Pattern:
+    """
+    Сборка одного выражения для всех включенных кодировок, чтобы текст просматривался один раз.
+    Кодировка совпадения определяется по имени группы (match.lastgroup).
+    :param encodings: Tuple[str, ...]. Включенные кодировки
+    :param min_length: int. Минимальная длина последовательности
+    :returns: re.Pattern. Скомпилированное выражение
+    """
+    alternatives = [
+        f"(?P<{encoding}>{ENCODING_PATTERNS[encoding].replace('MIN_LENGTH', str(min_length))})"
+        for encoding in ENCODINGS
+        if encoding in encodings
+    ]
+    return re.compile("|".join(alternatives))
+
+
+def estimate_decoded_size(encoding: str, length: int) -> int:
+    """
+    Верхняя оценка размера декодированных данных без декодирования.
+    :param encoding: str. Кодировка
+    :param length: int. Длина закодированной строки
+    :returns: int. Максимальный размер в байтах
+    """
+    if encoding in (BASE64, BASE64URL):
+        return length * 3 // 4 + 3
+    if encoding == BASE32:
+        return length * 5 // 8 + 5
+    if encoding == HEX:
+        return length // 2
+    return length
+
+
+# Декодеры подстрок, найденных get_encodings_pattern
+DECODERS: Dict[str, Callable[[str], bytes]] = {
+    BASE64: lambda fragment: base64.b64decode(fragment, validate=True),
+    BASE64URL: lambda fragment: base64.urlsafe_b64decode(fragment + "=" * (-len(fragment) % 4)),
+    BASE32: base64.b32decode,
+    HEX: bytes.fromhex,
+    PERCENT: unquote_to_bytes,
+}
+
+
+def decode(encoding: str, fragment: str) -> bytes | None:
+    """
+    Декодирование подстроки, найденной get_encodings_pattern.
+    :param encoding: str. Кодировка
+    :param fragment: str. Закодированная подстрока
+    :returns: bytes | None. Декодированные данные или None, если декодировать не удалось
+    """
+    decoder = DECODERS.get(encoding)
+    if decoder is None:
+        return None
+    try:
+        return decoder(fragment)
+    except (binascii.Error, ValueError):
+        return None
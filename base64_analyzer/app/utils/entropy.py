@@ -0,0 +1,54 @@
+from typing import List, Tuple
+
+import numpy as np
+from utils.encodings import BASE32, BASE64, BASE64URL, HEX
+
+# Классы символов (заглавные, строчные, цифры), которые ожидаются в случайных данных в каждой кодировке
+EXPECTED_CLASSES = {
+    BASE64: np.array([True, True, True]),
+    BASE64URL: np.array([True, True, True]),
+    BASE32: np.array([True, False, True]),
+    HEX: np.array([False, False, True]),
+}
+ALPHABET_SIZES = {BASE64: 64, BASE64URL: 64, BASE32: 32, HEX: 16}
+
+
+def score_candidates(text: str, spans: List[Tuple[int, int]], encodings: List[str]) -> np.ndarray:
+    """
+    Скор «случайности» кандидатов: энтропия Шеннона, нормированная на максимально возможную для длины
+    и алфавита, умноженная на долю ожидаемых классов символов, которые встретились в кандидате.
+    Все кандидаты запроса считаются одним векторизованным проходом по представлению текста в виде массива кодов.
+    Для кодировок без алфавита (percent) скор равен 1.
+    :param text: str. Исходный текст
+    :param spans: List[Tuple[int, int]]. Позиции кандидатов
+    :param encodings: List[str]. Кодировки кандидатов
+    :returns: np.ndarray. Скоры кандидатов от 0 до 1
+    """
+    scores = np.ones(len(spans))
+    scored = np.array([encoding in ALPHABET_SIZES for encoding in encodings], dtype=bool)
+    if not scored.any():
+        return scores
+
+    scored_spans = [span for span, is_scored in zip(spans, scored) if is_scored]
+    lengths = np.array([stop - start for start, stop in scored_spans], dtype=np.int64)
+    alphabet_sizes = np.array([ALPHABET_SIZES[encoding] for encoding in encodings if encoding in ALPHABET_SIZES])
+    expected_classes = np.array([EXPECTED_CLASSES[encoding] for encoding in encodings if encoding in EXPECTED_CLASSES])
+
+    # Кандидаты состоят только из ASCII, поэтому их конкатенация кодируется по байту на символ
+    candidates = "".join(text[start:stop] for start, stop in scored_spans)
+    chars = np.frombuffer(candidates.encode("ascii", errors="replace"), dtype=np.uint8).astype(np.int64) & 0x7F
+    candidate_ids = np.repeat(np.arange(len(lengths)), lengths)
+
+    counts = np.bincount(candidate_ids * 128 + chars, minlength=len(lengths) * 128).reshape(len(lengths), 128)
+    probabilities = counts / lengths[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.nansum(np.where(counts > 0, probabilities * np.log2(probabilities), 0.0), axis=1)
+    max_entropy = np.log2(np.minimum(lengths, alphabet_sizes))
+    normalized_entropy = np.divide(entropy, max_entropy, out=np.zeros_like(entropy), where=max_entropy > 0)
+
+    class_counts = [counts[:, ord(first) : ord(last) + 1].sum(1) for first, last in ("AZ", "az", "09")]
+    present_classes = np.stack(class_counts, axis=1) > 0
+    class_coverage = (present_classes & expected_classes).sum(1) / expected_classes.sum(1)
+
+    scores[scored] = np.clip(normalized_entropy * class_coverage, 0.0, 1.0)
+    return scores
@@ -8,6 +8,46 @@ class Config(BaseSettings):
     
     alerting_endpoint: str
 
+    link_check_timeout: float = 5.0
+
+    link_max_concurrent_checks: int = 10
+
+    redirect_cache_max_entries: int = 10_000
+
+    redirect_cache_ttl_seconds: float = 3600.0
+
+    redirect_host_negative_after: int = 3
+
+    # Адрес можно заменить на локальную заглушку VirusTotal, чтобы проверять сервис без доступа в интернет
+    virustotal_api_url: str = "https://www.virustotal.com/api/v3"
+
+    virustotal_cache_max_entries: int = 10_000
+
+    virustotal_clean_ttl_seconds: float = 24 * 3600.0
+
+    virustotal_malicious_ttl_seconds: float = 7 * 24 * 3600.0
+
+    # Отсутствие вердикта запоминается ненадолго, чтобы не запрашивать ClickHouse для каждой новой ссылки повторно
+    virustotal_miss_ttl_seconds: float = 30.0
+
+    # Таймауты клиента ClickHouse для хранилища вердиктов: поиск вердикта не должен ждать дольше самой проверки
+    virustotal_store_connect_timeout: float = 1.0
+
+    virustotal_store_query_timeout: float = 2.0
+
+    # Файл состояния общего для всех воркеров ограничителя запросов к VirusTotal
+    virustotal_limiter_path: str = "/tmp/link_analyzer_virustotal.bucket"
+
+    virustotal_requests_per_minute: float = 4.0
+
+    virustotal_burst: float = 1.0
+
+    virustotal_queue_max_size: int = 1000
+
+    virustotal_retry_attempts: int = 5
+
+    virustotal_retry_base_seconds: float = 30.0
+
     database: DatabaseConfig
 
 
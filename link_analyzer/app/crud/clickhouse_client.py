@@ -9,12 +9,14 @@ class ClickHouseDB:
         self.username = username
         self.password = password
 
-    def get_client(self):
+    def get_client(self, connect_timeout: float = 10, send_receive_timeout: float = 300):
         client = clickhouse_connect.get_client(
             host=self.host,
             port=self.port,
             username=self.username,
             password=self.password,
+            connect_timeout=connect_timeout,
+            send_receive_timeout=send_receive_timeout,
         )
         return client
 
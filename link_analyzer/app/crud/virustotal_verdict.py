@@ -0,0 +1,42 @@
+from clickhouse_connect.driver.client import Client
+from models.virustotal_verdict import VirustotalVerdict
+
+
+def create_virustotal_verdicts_table(client: Client):
+    # Строки удаляются самим ClickHouse по сроку жизни вердикта, повторные проверки ссылки схлопываются при слиянии
+    stmt = """
+    CREATE TABLE IF NOT EXISTS virustotal_verdicts (
+        url String,
+        malicious Bool,
+        checked_at DateTime,
+        expires_at DateTime
+    )
+    ENGINE = ReplacingMergeTree(checked_at)
+    ORDER BY url
+    TTL expires_at
+    """
+    client.command(stmt)
+
+
+def get_virustotal_verdict(client: Client, url: str) -> VirustotalVerdict | None:
+    stmt = """
+    SELECT url, malicious, checked_at, expires_at FROM virustotal_verdicts
+    WHERE url = %(url)s AND expires_at > now()
+    ORDER BY checked_at DESC
+    LIMIT 1
+    """
+    rows = client.query(stmt, parameters={"url": url}).named_results()
+    row = next(rows, None)
+    if row is None:
+        return None
+    return VirustotalVerdict(**row)
+
+
+def add_virustotal_verdict(client: Client, verdict: VirustotalVerdict) -> VirustotalVerdict:
+    stmt = """
+    INSERT INTO virustotal_verdicts (url, malicious, checked_at, expires_at)
+    VALUES (%(url)s, %(malicious)s, %(checked_at)s, %(expires_at)s)
+    """
+    client.query(stmt, parameters=verdict.model_dump())
+
+    return verdict
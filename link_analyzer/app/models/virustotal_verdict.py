@@ -0,0 +1,17 @@
+from datetime import datetime, timedelta, timezone
+
+from pydantic import BaseModel, Field
+
+
+class VirustotalVerdict(BaseModel):
+    url: str
+    malicious: bool
+    checked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    expires_at: datetime
+
+    @classmethod
+    def create(cls, url: str, malicious: bool, ttl_seconds: float) -> "VirustotalVerdict":
+        checked_at = datetime.now(timezone.utc)
+        return cls(
+            url=url, malicious=malicious, checked_at=checked_at, expires_at=checked_at + timedelta(seconds=ttl_seconds)
+        )
@@ -39,7 +39,7 @@ async def input(
 ):
     product_vault = get_vault_for_product(product)
 
-    result = analyzers_service.analyze_input(
+    result = await analyzers_service.analyze_input(
         text=input_request.input_text,
         vault=product_vault,
     )
@@ -78,7 +78,7 @@ async def output(
 ):
     product_vault = get_vault_for_product(product)
 
-    result = analyzers_service.analyze_input(
+    result = await analyzers_service.analyze_input(
         text=output_request.output_text,
         vault=product_vault,
     )
@@ -2,9 +2,13 @@ import json
 
 from fastapi import APIRouter, Depends, status
 from models.product import Product
-from routers import verify_api_key
+from routers import verify_admin_api_key, verify_api_key
+from schemas.redirect_cache import RedirectCacheStats
 from schemas.vault import VaultExample
+from schemas.virustotal_queue import VirustotalQueueStats
+from services.redirect_cache import redirect_cache
 from services.vault_manager import Vault, vault_manager
+from services.virustotal_queue import virustotal_queue
 
 manager_router = APIRouter(prefix="/manager")
 
@@ -25,3 +29,23 @@ async def add_vault(
 async def get_vault_example():
     str_schema = json.dumps(Vault.model_json_schema())
     return VaultExample(vault_schema=str_schema)
+
+
+@manager_router.get(
+    "/redirect_cache_stats",
+    status_code=status.HTTP_200_OK,
+    response_model=RedirectCacheStats,
+    dependencies=[Depends(verify_admin_api_key)],
+)
+async def get_redirect_cache_stats():
+    return redirect_cache.stats()
+
+
+@manager_router.get(
+    "/virustotal_queue_stats",
+    status_code=status.HTTP_200_OK,
+    response_model=VirustotalQueueStats,
+    dependencies=[Depends(verify_admin_api_key)],
+)
+async def get_virustotal_queue_stats():
+    return virustotal_queue.stats()
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class RedirectCacheStats(BaseModel):
+    hits: int
+    host_hits: int
+    misses: int
+    hit_rate: float
+    urls: int
+    negative_hosts: int
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class VirustotalQueueStats(BaseModel):
+    depth: int
+    retrying: int
+    enqueued: int
+    completed: int
+    retried: int
+    failed: int
+    rejected: int
+    average_wait_seconds: float
+    oldest_wait_seconds: float
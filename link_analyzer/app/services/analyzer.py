@@ -1,6 +1,7 @@
-from time import sleep
+import asyncio
 import os
 
+from core.config import main_config
 from schemas.model_result import ModelResult
 from services.model import LinkModel
 from services.vault_manager import Vault
@@ -10,16 +11,21 @@ class Analyzer:
     def __init__(
         self,
     ) -> None:
-        self.model = LinkModel(virustotal_api_key=os.environ["VIRUSTOTAL_KEY"])
+        self.model = LinkModel(
+            virustotal_api_key=os.environ["VIRUSTOTAL_KEY"],
+            check_timeout=main_config.link_check_timeout,
+            max_concurrent_checks=main_config.link_max_concurrent_checks,
+            virustotal_api_url=main_config.virustotal_api_url,
+        )
 
-    def analyze_input(self, text: str, vault: Vault) -> ModelResult:
-        model_output = self.model.input_score(text, vault)
-        sleep(1)
+    async def analyze_input(self, text: str, vault: Vault) -> ModelResult:
+        model_output = await self.model.input_score(text, vault)
+        await asyncio.sleep(1)
 
         return model_output
 
-    def analyze_output(self, text: str, vault: Vault) -> ModelResult:
-        model_output = self.model.output_score(text, vault)
-        sleep(1)
+    async def analyze_output(self, text: str, vault: Vault) -> ModelResult:
+        model_output = await self.model.output_score(text, vault)
+        await asyncio.sleep(1)
 
         return model_output
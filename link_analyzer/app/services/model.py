@@ -1,24 +1,46 @@
 from models.vault import Vault
 from schemas.model_result import ModelResult, Reason
+import asyncio
 import re
-from typing import List, Tuple
-import requests
+from typing import Awaitable, Callable, List, Tuple
+import httpx
 from urllib.parse import urlparse, quote
-import time
+from services.redirect_cache import redirect_cache
+from services.verdict_store import verdict_store
+from services.virustotal_queue import virustotal_limiter, virustotal_queue
+from utils.urls import normalize_url
+
+REDIRECT_STATUS_CODES = {301, 302, 303, 307, 308}
 
 class LinkModel:
     """
     Анализатор для извлечения ссылок из входящей строки и проверки их на наличие уязвимостей, включая проверку VirusTotal.
     """
-    def __init__(self, virustotal_api_key: str) -> None:
+    def __init__(
+        self,
+        virustotal_api_key: str,
+        check_timeout: float = 5.0,
+        max_concurrent_checks: int = 10,
+        virustotal_api_url: str = "https://www.virustotal.com/api/v3",
+    ) -> None:
         self.executable_extensions = ['.exe', '.bat', '.cmd', '.sh', '.php', '.pl', '.py']
         self.known_dangerous_links = {"https://vulnerable.com", "https://phishingsite.com"}
         self.virustotal_api_key = virustotal_api_key
-        self.virustotal_limit_reached = False
-        self.virustotal_last_request_time = 0
-        
-    def input_score(self, text: str, vault: Vault) -> ModelResult:
-        metric, reasons = self.analyze(
+        # Общие пулы соединений на все запросы; check_timeout ограничивает каждую сетевую проверку целиком,
+        # а семафор — число одновременных проверок, чтобы большой текст со ссылками не открывал сотни соединений
+        self.check_timeout = check_timeout
+        self.check_semaphore = asyncio.Semaphore(max_concurrent_checks)
+        limits = httpx.Limits(max_connections=max_concurrent_checks, max_keepalive_connections=max_concurrent_checks)
+        self.redirect_client = httpx.AsyncClient(verify=False, timeout=check_timeout, limits=limits)
+        self.virustotal_client = httpx.AsyncClient(
+            base_url=virustotal_api_url,
+            headers={"accept": "application/json", "x-apikey": virustotal_api_key},
+            timeout=check_timeout,
+            limits=limits,
+        )
+
+    async def input_score(self, text: str, vault: Vault) -> ModelResult:
+        metric, reasons = await self.analyze(
             text, 
             vault.check_known_dangerous_input, 
             vault.check_executable_input, 
@@ -33,8 +55,8 @@ class LinkModel:
 
         return model_output
 
-    def output_score(self, text: str, vault: Vault) -> ModelResult:
-        metric, reasons = self.analyze(
+    async def output_score(self, text: str, vault: Vault) -> ModelResult:
+        metric, reasons = await self.analyze(
             text, 
             vault.check_known_dangerous_output, 
             vault.check_executable_output, 
@@ -60,7 +82,10 @@ class LinkModel:
 
         for match in matches:
             link = match.group(0)
-            parsed_link = urlparse(link)
+            try:
+                parsed_link = urlparse(link)
+            except ValueError:  # Например, незакрытая квадратная скобка IPv6-адреса
+                continue
             if all([parsed_link.scheme, parsed_link.netloc]):
                 start_pos, end_pos = match.span()
                 links.append((link, start_pos, end_pos))
@@ -88,70 +113,142 @@ class LinkModel:
                 return True
         return False
 
-    def check_virustotal(self, link: str) -> bool:
+    async def check_virustotal(self, link: str) -> bool:
         """
-        Проверяет ссылку через VirusTotal API.
+        Проверяет ссылку через VirusTotal API, если общий лимит запросов позволяет сделать это сразу.
+        Каждый запрос к VirusTotal — отправка ссылки на анализ и получение результата — расходует свой токен.
+        Иначе, как и при неудачной или прерванной по таймауту проверке, ссылка ставится в фоновую очередь вместе
+        с уже созданным анализом, а запрос получает False; вердикт фоновой проверки попадет в verdict_store
+        и будет использован следующими запросами.
         Возвращает True, если сайт помечен как вредоносный.
         """
-        if self.virustotal_limit_reached:
-            print(f"Skipping VirusTotal check due to request limit reached.")
-            return False
-
-        # Ограничение скорости запросов: не более 4 запросов в минуту
-        current_time = time.time()
-        if current_time - self.virustotal_last_request_time < 15:
-            print("VirusTotal rate limits...")
-            return False
-        
-        self.virustotal_last_request_time = time.time()
+        analysis_id = None
+        try:
+            if await self.acquire_virustotal():
+                analysis_id = await self.submit_virustotal(link)
+            if analysis_id is not None and await self.acquire_virustotal():
+                malicious = await self.poll_virustotal(link, analysis_id)
+                if malicious is not None:
+                    return malicious
+        except asyncio.CancelledError:
+            virustotal_queue.enqueue(link, self, analysis_id)
+            raise
+        virustotal_queue.enqueue(link, self, analysis_id)
+        return False
 
-        url = "https://www.virustotal.com/api/v3/urls"
-        headers = {
-            "accept": "application/json",
-            "x-apikey": self.virustotal_api_key,
-            "content-type": "application/x-www-form-urlencoded"
-        }
+    @staticmethod
+    async def acquire_virustotal() -> bool:
+        # Файл общего ограничителя блокируется в потоке, чтобы ожидание блокировки не останавливало цикл событий
+        return await asyncio.to_thread(virustotal_limiter.try_acquire) == 0
 
+    async def submit_virustotal(self, link: str) -> str | None:
+        """
+        Отправка ссылки на анализ в VirusTotal.
+        Возвращает идентификатор анализа или None, если превышен лимит или произошла ошибка сети.
+        """
         # Преобразование ссылки для соответствия требованиям VirusTotal
         encoded_url = quote(link, safe='')
         data = f"url={encoded_url}"
+        result = await self.request_virustotal(
+            link, "POST", "/urls", content=data, headers={"content-type": "application/x-www-form-urlencoded"}
+        )
+        return None if result is None else result['id']
+
+    async def poll_virustotal(self, link: str, analysis_id: str) -> bool | None:
+        """
+        Получение результата анализа ссылки в VirusTotal. Вердикт сохраняется в verdict_store.
+        Возвращает True, если сайт помечен как вредоносный, и None, если вердикта пока нет: превышен лимит,
+        ошибка сети или анализ не завершен.
+        """
+        result = await self.request_virustotal(link, "GET", f"/analyses/{analysis_id}")
+        if result is None:
+            return None
+        attributes = result['attributes']
+        malicious = attributes['stats']['malicious'] > 0
+        # Незавершенный анализ еще не дает чистого вердикта
+        if not malicious and attributes.get('status') != 'completed':
+            return None
+        verdict_store.put(link, malicious)
+        if malicious:
+            print(f"Link flagged by VirusTotal as malicious: {link}")
+        return malicious
 
+    async def request_virustotal(self, link: str, method: str, url: str, **kwargs) -> dict | None:
+        """
+        Один запрос к VirusTotal API. Возвращает поле data ответа или None, если превышен лимит
+        или произошла ошибка сети.
+        """
         try:
-            response = requests.post(url, headers=headers, data=data)
+            response = await self.virustotal_client.request(method, url, **kwargs)
             if response.status_code == 429:  # Превышен лимит запросов
-                self.virustotal_limit_reached = True
-                print("VirusTotal request limit reached.")
-                return False
-
-            result = response.json()
-            id = result['data']['id']
-            url = f"https://www.virustotal.com/api/v3/analyses/{id}"
-            headers = {"accept": "application/json",
-                       "x-apikey": self.virustotal_api_key,}
-            response = requests.get(url, headers=headers)
-            result = response.json()
-            if result['data']['attributes']['stats']['malicious'] > 0:
-                print(f"Link flagged by VirusTotal as malicious: {link}")
-                return True
-        except requests.exceptions.RequestException as e:
+                await self.block_virustotal(response)
+                return None
+            response.raise_for_status()
+            return response.json()['data']
+        except httpx.HTTPError as e:
             print(f"Ошибка при попытке проверки VirusTotal {link}: {e}")
-        
-        return False
+            return None
 
-    def check_for_redirects(self, link: str) -> bool:
+    @staticmethod
+    async def block_virustotal(response: httpx.Response):
+        """
+        Пауза в запросах к VirusTotal для всех воркеров после ответа 429: на время из Retry-After
+        или на минуту, если заголовка нет.
+        """
+        retry_after = response.headers.get("retry-after", "")
+        seconds = float(retry_after) if retry_after.isdigit() else 60.0
+        print(f"VirusTotal request limit reached, pausing for {seconds:.0f} s.")
+        await asyncio.to_thread(virustotal_limiter.block, seconds)
+
+    async def check_for_redirects(self, link: str) -> bool:
         """
         Проверяет, перенаправляет ли ссылка пользователя на другой URL (редирект).
-        Возвращает True, если ссылка ведет на редирект.
+        Возвращает True, если ссылка ведет на редирект. Полученный ответ сохраняется в redirect_cache.
         """
         try:
-            response = requests.head(link, allow_redirects=False, verify=False)
-            if response.is_redirect or response.status_code in [301, 302, 303, 307, 308]:
-                return True
-        except requests.exceptions.RequestException as e:
+            response = await self.redirect_client.head(link, follow_redirects=False)
+        # Ссылку, которую httpx не может разобрать или перевести в IDNA, проверить нельзя, но это не ошибка сервиса
+        except (httpx.HTTPError, httpx.InvalidURL, UnicodeError, ValueError) as e:
             print(f"Ошибка при попытке проверки редиректа {link}: {e}")
-        return False
-    
-    def analyze(
+            return False
+        redirects = response.is_redirect or response.status_code in REDIRECT_STATUS_CODES
+        redirect_cache.put(link, redirects)
+        return redirects
+
+    async def check_remote(self, link: str, check_redirects: bool, check_virustotal: bool) -> bool:
+        """
+        Сетевые проверки одной ссылки: сначала кэш редиректов и хранилище вердиктов, затем редирект и VirusTotal.
+        VirusTotal не запрашивается, если ссылка уже признана опасной, чтобы не тратить лимит запросов.
+        Возвращает True, если ссылка опасна.
+        """
+        # Ссылка или хост из кэша не запрашиваются и не ждут семафор
+        redirects = redirect_cache.get(link) if check_redirects else False
+        if redirects:
+            return True
+        # Сохраненный вердикт не расходует лимит запросов VirusTotal. Поиск в ClickHouse — тоже сетевая проверка:
+        # если хранилище не ответило за check_timeout, ссылка проверяется в VirusTotal
+        malicious = await self.run_check(verdict_store.get, link) if check_virustotal else False
+        if malicious:
+            return True
+
+        if redirects is None and await self.run_check(self.check_for_redirects, link):
+            return True
+        return malicious is None and bool(await self.run_check(self.check_virustotal, link))
+
+    async def run_check(self, check: Callable[[str], Awaitable[bool | None]], link: str) -> bool | None:
+        """
+        Сетевая проверка ссылки под общим семафором, ограниченная по времени.
+        Возвращает результат проверки или None, если проверка не уложилась в check_timeout.
+        """
+        async with self.check_semaphore:
+            try:
+                async with asyncio.timeout(self.check_timeout):
+                    return await check(link)
+            except TimeoutError:
+                print(f"Превышено время проверки {link}: {check.__name__}")
+                return None
+
+    async def analyze(
         self,
         text: str,
         check_known_dangerous: bool=True,
@@ -162,10 +259,13 @@ class LinkModel:
         """
         Анализирует текст на наличие вредоносных ссылок.
         Проверяет через VirusTotal, исполняемые файлы, редиректы и XSS уязвимости.
+        Локальные проверки выполняются сразу, сетевые — параллельно для всех ссылок,
+        поэтому время ответа определяется самой долгой проверкой, а не их суммой.
         Возвращает общий скор и список координат ссылок, где найдены уязвимости.
         """
         links = self.extract_links(text)
         vulnerabilities = []
+        remote_links = []
 
         for link, start_pos, end_pos in links:
             # Проверка на известные опасные ссылки
@@ -178,14 +278,30 @@ class LinkModel:
                 vulnerabilities.append(Reason(start=start_pos, stop=end_pos))
                 continue
 
-            # Проверка на редиректы
-            if check_redirects and self.check_for_redirects(link):
-                vulnerabilities.append(Reason(start=start_pos, stop=end_pos))
-                continue
+            remote_links.append((link, start_pos, end_pos))
 
-            # Проверка через VirusTotal
-            if check_virustotal and self.check_virustotal(link):
-                vulnerabilities.append(Reason(start=start_pos, stop=end_pos))
-                continue
+        # Проверка на редиректы и через VirusTotal
+        if remote_links and (check_redirects or check_virustotal):
+            vulnerabilities.extend(await self.analyze_remote(remote_links, check_redirects, check_virustotal))
+
+        # Порядок причин — порядок ссылок в тексте, как при последовательной проверке
+        vulnerabilities.sort(key=lambda reason: reason.start)
+        return len(vulnerabilities), vulnerabilities
 
-        return len(vulnerabilities), vulnerabilities
\ No newline at end of file
+    async def analyze_remote(
+        self, links: List[Tuple[str, int, int]], check_redirects: bool, check_virustotal: bool
+    ) -> List[Reason]:
+        """
+        Сетевые проверки ссылок, параллельно для всех ссылок. Повторяющиеся в тексте ссылки проверяются один раз.
+        Возвращает координаты опасных ссылок.
+        """
+        unique_links = {normalize_url(link): link for link, _, _ in links}
+        results = await asyncio.gather(
+            *(self.check_remote(link, check_redirects, check_virustotal) for link in unique_links.values())
+        )
+        dangerous_links = {url for url, dangerous in zip(unique_links, results) if dangerous}
+        return [
+            Reason(start=start_pos, stop=end_pos)
+            for link, start_pos, end_pos in links
+            if normalize_url(link) in dangerous_links
+        ]
@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import NamedTuple
+
+from core.config import main_config
+from schemas.redirect_cache import RedirectCacheStats
+from utils.urls import normalize_host, normalize_url
+
+
+class CachedRedirect(NamedTuple):
+    redirects: bool
+    expires: float
+
+
+class HostState(NamedTuple):
+    non_redirects: int
+    redirected: bool
+    expires: float
+
+
+class RedirectCache:
+    """
+    LRU-кэш результатов проверки редиректов с ограниченным временем жизни, ключ — нормализованная ссылка.
+    Дополнительно хранится отрицательный кэш хостов: хост, по которому подряд получено host_negative_after
+    ответов без редиректа и ни одного редиректа, считается не перенаправляющим, и новые ссылки на нем
+    не проверяются до истечения ttl_seconds.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, host_negative_after: int) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.host_negative_after = host_negative_after
+        self.urls: OrderedDict[str, CachedRedirect] = OrderedDict()
+        self.hosts: OrderedDict[str, HostState] = OrderedDict()
+        self.hits = 0
+        self.host_hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get(self, link: str) -> bool | None:
+        """
+        Результат проверки ссылки из кэша.
+        :param link: str. Ссылка
+        :returns: bool | None. True, если ссылка ведет на редирект; None, если результата в кэше нет
+        """
+        url, host, now = normalize_url(link), normalize_host(link), monotonic()
+        with self.lock:
+            cached = self.urls.get(url)
+            if cached is not None:
+                if cached.expires > now:
+                    self.urls.move_to_end(url)
+                    self.hits += 1
+                    return cached.redirects
+                del self.urls[url]
+
+            state = self.hosts.get(host)
+            if state is not None:
+                if state.expires <= now:
+                    del self.hosts[host]
+                elif not state.redirected and state.non_redirects >= self.host_negative_after:
+                    self.hosts.move_to_end(host)
+                    self.host_hits += 1
+                    return False
+
+            self.misses += 1
+            return None
+
+    def put(self, link: str, redirects: bool):
+        """
+        Сохранение результата проверки ссылки. Ошибки сети сохранять не нужно.
+        :param link: str. Ссылка
+        :param redirects: bool. True, если ссылка ведет на редирект
+        """
+        url, host, now = normalize_url(link), normalize_host(link), monotonic()
+        expires = now + self.ttl_seconds
+        with self.lock:
+            self.urls[url] = CachedRedirect(redirects, expires)
+            self.urls.move_to_end(url)
+
+            state = self.hosts.pop(host, None)
+            if state is None or state.expires <= now:
+                state = HostState(0, False, expires)
+            # Один редирект снимает хост с отрицательного кэша до истечения срока жизни записи
+            self.hosts[host] = HostState(state.non_redirects + (not redirects), state.redirected or redirects, expires)
+
+            while len(self.urls) > self.max_entries:
+                self.urls.popitem(last=False)
+            while len(self.hosts) > self.max_entries:
+                self.hosts.popitem(last=False)
+
+    def stats(self) -> RedirectCacheStats:
+        with self.lock:
+            lookups = self.hits + self.host_hits + self.misses
+            return RedirectCacheStats(
+                hits=self.hits,
+                host_hits=self.host_hits,
+                misses=self.misses,
+                hit_rate=(self.hits + self.host_hits) / lookups if lookups else 0.0,
+                urls=len(self.urls),
+                negative_hosts=sum(
+                    not state.redirected and state.non_redirects >= self.host_negative_after
+                    for state in self.hosts.values()
+                ),
+            )
+
+
+redirect_cache = RedirectCache(
+    max_entries=main_config.redirect_cache_max_entries,
+    ttl_seconds=main_config.redirect_cache_ttl_seconds,
+    host_negative_after=main_config.redirect_host_negative_after,
+)
@@ -0,0 +1,146 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock, local
+from time import monotonic
+from typing import NamedTuple
+
+from clickhouse_connect.driver.client import Client
+from core.config import main_config
+from crud.clickhouse_client import ClickHouseDB
+from crud.clickhouse_client import client as clickhouse_db
+from crud.virustotal_verdict import add_virustotal_verdict, create_virustotal_verdicts_table, get_virustotal_verdict
+from models.virustotal_verdict import VirustotalVerdict
+from utils.urls import normalize_url
+
+
+class CachedVerdict(NamedTuple):
+    malicious: bool | None  # None — вердикта в ClickHouse нет
+    expires: float
+
+
+class VerdictStore:
+    """
+    Хранилище вердиктов VirusTotal: общая для всех реплик таблица ClickHouse и локальный LRU-кэш перед ней.
+    Срок жизни задается для каждого вердикта: опасные ссылки перепроверяются реже чистых, отсутствие вердикта
+    запоминается на miss_ttl_seconds.
+    Ошибки ClickHouse не прерывают проверку: вердикт остается в локальном кэше.
+    """
+
+    def __init__(
+        self,
+        db: ClickHouseDB,
+        max_entries: int,
+        clean_ttl_seconds: float,
+        malicious_ttl_seconds: float,
+        miss_ttl_seconds: float,
+        connect_timeout: float,
+        query_timeout: float,
+    ) -> None:
+        self.db = db
+        self.max_entries = max_entries
+        self.clean_ttl_seconds = clean_ttl_seconds
+        self.malicious_ttl_seconds = malicious_ttl_seconds
+        self.miss_ttl_seconds = miss_ttl_seconds
+        self.connect_timeout = connect_timeout
+        self.query_timeout = query_timeout
+        self.verdicts: OrderedDict[str, CachedVerdict] = OrderedDict()
+        self.lock = Lock()
+        # Клиенты ClickHouse создаются при первом обращении, у каждого потока свой: запросы не ждут друг друга
+        self.local = local()
+
+    def get_db_client(self) -> Client:
+        db_client = getattr(self.local, "db_client", None)
+        if db_client is None:
+            db_client = self.db.get_client(
+                connect_timeout=self.connect_timeout, send_receive_timeout=self.query_timeout
+            )
+            create_virustotal_verdicts_table(db_client)
+            self.local.db_client = db_client
+        return db_client
+
+    def load_verdict(self, url: str) -> bool | None:
+        """
+        Чтение вердикта из ClickHouse в локальный кэш. Выполняется в потоке, поэтому результат попадает в кэш,
+        даже если ожидающая его проверка уже прервана по таймауту.
+        :param url: str. Нормализованная ссылка
+        :returns: bool | None. True, если ссылка вредоносная; None, если вердикта нет или ClickHouse недоступен
+        """
+        try:
+            verdict = get_virustotal_verdict(self.get_db_client(), url)
+        except Exception as e:
+            print(f"Ошибка при чтении вердикта VirusTotal {url}: {e}")
+            verdict = None
+        if verdict is None:
+            self.cache(url, None, self.miss_ttl_seconds)
+            return None
+        # clickhouse_connect возвращает DateTime без часового пояса, в UTC
+        expires_at = verdict.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        self.cache(url, verdict.malicious, (expires_at - datetime.now(timezone.utc)).total_seconds())
+        return verdict.malicious
+
+    def save_verdict(self, verdict: VirustotalVerdict):
+        try:
+            add_virustotal_verdict(self.get_db_client(), verdict)
+        except Exception as e:
+            print(f"Ошибка при сохранении вердикта VirusTotal {verdict.url}: {e}")
+
+    def cache(self, url: str, malicious: bool | None, ttl_seconds: float):
+        with self.lock:
+            # Промах, прочитанный до сохранения нового вердикта, не должен его затереть
+            if malicious is None and url in self.verdicts:
+                return
+            self.verdicts[url] = CachedVerdict(malicious, monotonic() + ttl_seconds)
+            self.verdicts.move_to_end(url)
+            while len(self.verdicts) > self.max_entries:
+                self.verdicts.popitem(last=False)
+
+    def get_cached(self, url: str) -> CachedVerdict | None:
+        with self.lock:
+            cached = self.verdicts.get(url)
+            if cached is None:
+                return None
+            if cached.expires <= monotonic():
+                del self.verdicts[url]
+                return None
+            self.verdicts.move_to_end(url)
+            return cached
+
+    async def get(self, link: str) -> bool | None:
+        """
+        Вердикт для ссылки: из локального кэша, иначе из ClickHouse.
+        :param link: str. Ссылка
+        :returns: bool | None. True, если ссылка вредоносная; None, если действующего вердикта нет
+        """
+        url = normalize_url(link)
+        cached = self.get_cached(url)
+        if cached is not None:
+            return cached.malicious
+        # Клиент ClickHouse синхронный, поэтому запрос выполняется в потоке, чтобы не блокировать цикл событий
+        return await asyncio.to_thread(self.load_verdict, url)
+
+    def put(self, link: str, malicious: bool):
+        """
+        Сохранение вердикта в локальный кэш и в ClickHouse. Запись в ClickHouse выполняется в фоновом потоке
+        и не задерживает проверку. Должно вызываться из работающего цикла событий.
+        :param link: str. Ссылка
+        :param malicious: bool. True, если ссылка вредоносная
+        """
+        url = normalize_url(link)
+        ttl_seconds = self.malicious_ttl_seconds if malicious else self.clean_ttl_seconds
+        self.cache(url, malicious, ttl_seconds)
+        verdict = VirustotalVerdict.create(url, malicious, ttl_seconds)
+        asyncio.get_running_loop().run_in_executor(None, self.save_verdict, verdict)
+
+
+verdict_store = VerdictStore(
+    db=clickhouse_db,
+    max_entries=main_config.virustotal_cache_max_entries,
+    clean_ttl_seconds=main_config.virustotal_clean_ttl_seconds,
+    malicious_ttl_seconds=main_config.virustotal_malicious_ttl_seconds,
+    miss_ttl_seconds=main_config.virustotal_miss_ttl_seconds,
+    connect_timeout=main_config.virustotal_store_connect_timeout,
+    query_timeout=main_config.virustotal_store_query_timeout,
+)
@@ -0,0 +1,170 @@
+import asyncio
+from threading import Lock
+from time import monotonic
+from typing import NamedTuple, Protocol
+
+from core.config import main_config
+from schemas.virustotal_queue import VirustotalQueueStats
+from utils.token_bucket import FileTokenBucket
+from utils.urls import normalize_url
+
+# Вес новой проверки в скользящем среднем времени ожидания
+WAIT_SMOOTHING = 0.1
+
+
+class VirustotalScanner(Protocol):
+    async def submit_virustotal(self, link: str) -> str | None:
+        """Отправка ссылки на анализ: идентификатор анализа или None"""
+
+    async def poll_virustotal(self, link: str, analysis_id: str) -> bool | None:
+        """Результат анализа: вердикт или None, если его пока нет"""
+
+
+class QueuedLink(NamedTuple):
+    link: str
+    # Отправляет ссылку на анализ и запрашивает результат: True или False — вердикт, None — вердикта нет
+    scanner: VirustotalScanner
+    attempt: int
+    enqueued_at: float
+    # Созданный анализ: повторные попытки только запрашивают его результат, ссылка не отправляется заново
+    analysis_id: str | None = None
+
+
+class VirustotalQueue:
+    """
+    Фоновая очередь проверок VirusTotal для ссылок, которые не удалось проверить во время запроса:
+    лимит исчерпан, VirusTotal ответил 429, ошибка сети или анализ еще не завершен.
+    Один фоновый обработчик берет ссылки по мере появления токенов в virustotal_limiter, каждый запрос
+    к VirusTotal расходует один токен: сначала ссылка отправляется на анализ, затем запрашивается его результат.
+    Неудачный запрос повторяется с экспоненциально растущей задержкой, но не больше max_attempts раз.
+    Вердикт сохраняется самой проверкой в verdict_store, откуда его получат следующие запросы.
+    """
+
+    def __init__(self, limiter: FileTokenBucket, max_size: int, max_attempts: int, retry_base_seconds: float) -> None:
+        self.limiter = limiter
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.queue: asyncio.Queue[QueuedLink] = asyncio.Queue()
+        self.worker: asyncio.Task | None = None
+        # Время первой постановки в очередь по нормализованной ссылке: одна ссылка не попадает в очередь дважды
+        self.pending: dict[str, float] = {}
+        self.retrying = 0
+        self.enqueued = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.rejected = 0
+        self.average_wait_seconds = 0.0
+        self.lock = Lock()
+
+    def enqueue(self, link: str, scanner: VirustotalScanner, analysis_id: str | None = None) -> bool:
+        """
+        Постановка ссылки в очередь. Должна вызываться из работающего цикла событий.
+        :param link: str. Ссылка
+        :param scanner: VirustotalScanner. Запросы к VirusTotal
+        :param analysis_id: str | None. Уже созданный для ссылки анализ
+        :returns: bool. False, если ссылка уже в очереди или очередь заполнена
+        """
+        url = normalize_url(link)
+        with self.lock:
+            if url in self.pending:
+                return False
+            if len(self.pending) >= self.max_size:
+                self.rejected += 1
+                return False
+            now = monotonic()
+            self.pending[url] = now
+            self.enqueued += 1
+        self.queue.put_nowait(QueuedLink(link, scanner, 0, now, analysis_id))
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.get_running_loop().create_task(self.run())
+        return True
+
+    def retry(self, item: QueuedLink):
+        with self.lock:
+            self.retrying -= 1
+        self.queue.put_nowait(item)
+
+    def finish(self, item: QueuedLink, completed: bool):
+        with self.lock:
+            enqueued_at = self.pending.pop(normalize_url(item.link), item.enqueued_at)
+            if completed:
+                self.completed += 1
+                wait_seconds = monotonic() - enqueued_at
+                if self.completed == 1:
+                    self.average_wait_seconds = wait_seconds
+                else:
+                    self.average_wait_seconds += WAIT_SMOOTHING * (wait_seconds - self.average_wait_seconds)
+            else:
+                self.failed += 1
+
+    async def acquire(self):
+        # Файл ограничителя блокируется в потоке, чтобы ожидание блокировки не останавливало цикл событий
+        wait_seconds = await asyncio.to_thread(self.limiter.try_acquire)
+        while wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+            wait_seconds = await asyncio.to_thread(self.limiter.try_acquire)
+
+    async def run(self):
+        while True:
+            item = await self.queue.get()
+            await self.acquire()
+            analysis_id, malicious = item.analysis_id, None
+            try:
+                if analysis_id is None:
+                    analysis_id = await item.scanner.submit_virustotal(item.link)
+                else:
+                    malicious = await item.scanner.poll_virustotal(item.link, analysis_id)
+            except Exception as e:
+                print(f"Ошибка фоновой проверки VirusTotal {item.link}: {e}")
+            self.reschedule(item, analysis_id, malicious)
+
+    def reschedule(self, item: QueuedLink, analysis_id: str | None, malicious: bool | None):
+        """
+        Следующий шаг после запроса к VirusTotal: завершение проверки, запрос результата созданного анализа
+        или повтор с задержкой.
+        """
+        if malicious is not None:
+            self.finish(item, completed=True)
+        elif analysis_id != item.analysis_id:
+            # Ссылка отправлена на анализ, результат запрашивается следующим запросом со своим токеном
+            self.queue.put_nowait(item._replace(analysis_id=analysis_id))
+        elif item.attempt + 1 >= self.max_attempts:
+            print(f"VirusTotal check failed after {self.max_attempts} attempts: {item.link}")
+            self.finish(item, completed=False)
+        else:
+            with self.lock:
+                self.retried += 1
+                self.retrying += 1
+            delay = self.retry_base_seconds * 2**item.attempt
+            asyncio.get_running_loop().call_later(delay, self.retry, item._replace(attempt=item.attempt + 1))
+
+    def stats(self) -> VirustotalQueueStats:
+        with self.lock:
+            now = monotonic()
+            return VirustotalQueueStats(
+                depth=len(self.pending),
+                retrying=self.retrying,
+                enqueued=self.enqueued,
+                completed=self.completed,
+                retried=self.retried,
+                failed=self.failed,
+                rejected=self.rejected,
+                average_wait_seconds=self.average_wait_seconds,
+                oldest_wait_seconds=now - min(self.pending.values()) if self.pending else 0.0,
+            )
+
+
+virustotal_limiter = FileTokenBucket(
+    path=main_config.virustotal_limiter_path,
+    rate_per_second=main_config.virustotal_requests_per_minute / 60,
+    capacity=main_config.virustotal_burst,
+)
+
+virustotal_queue = VirustotalQueue(
+    limiter=virustotal_limiter,
+    max_size=main_config.virustotal_queue_max_size,
+    max_attempts=main_config.virustotal_retry_attempts,
+    retry_base_seconds=main_config.virustotal_retry_base_seconds,
+)
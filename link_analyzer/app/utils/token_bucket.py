@@ -0,0 +1,62 @@
+import fcntl
+import os
+import struct
+import time
+
+# Состояние корзины: число токенов и момент, с которого идет пополнение
+STATE = struct.Struct("dd")
+
+
+class FileTokenBucket:
+    """
+    Ограничитель скорости «корзина токенов», общий для всех процессов на машине: состояние хранится
+    в небольшом файле и изменяется под исключительной блокировкой fcntl.flock, поэтому воркеры uvicorn
+    расходуют один лимит. Токены пополняются со скоростью rate_per_second до capacity.
+    Методы ждут блокировку файла, поэтому из асинхронного кода они вызываются через asyncio.to_thread.
+    """
+
+    def __init__(self, path: str, rate_per_second: float, capacity: float) -> None:
+        self.path = path
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+
+    def update(self, change) -> float:
+        """
+        Чтение, изменение и запись состояния под блокировкой файла.
+        :param change: Callable[[float, float, float], Tuple[float, float, float]]. Принимает токены, начало
+            пополнения и текущее время, возвращает новые токены, новое начало пополнения и результат
+        :returns: float. Результат change
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            data = os.pread(fd, STATE.size, 0)
+            now = time.time()
+            tokens, refill_from = STATE.unpack(data) if len(data) == STATE.size else (self.capacity, now)
+            # Пополнение не начинается раньше refill_from: так block() оставляет корзину пустой на время паузы
+            tokens = min(self.capacity, tokens + max(0.0, now - refill_from) * self.rate_per_second)
+            tokens, refill_from, result = change(tokens, max(refill_from, now), now)
+            os.pwrite(fd, STATE.pack(tokens, refill_from), 0)
+            return result
+        finally:
+            os.close(fd)
+
+    def try_acquire(self) -> float:
+        """
+        Попытка взять один токен.
+        :returns: float. 0, если токен получен, иначе через сколько секунд он появится
+        """
+
+        def change(tokens: float, refill_from: float, now: float):
+            if tokens >= 1:
+                return tokens - 1, refill_from, 0.0
+            return tokens, refill_from, (refill_from - now) + (1 - tokens) / self.rate_per_second
+
+        return self.update(change)
+
+    def block(self, seconds: float):
+        """
+        Опустошение корзины и пауза в пополнении, например после ответа 429.
+        :param seconds: float. Длительность паузы
+        """
+        self.update(lambda tokens, refill_from, now: (0.0, max(refill_from, now + seconds), 0.0))
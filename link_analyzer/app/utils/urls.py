@@ -0,0 +1,31 @@
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_host(link: str) -> str:
+    """
+    Хост ссылки в нижнем регистре, без учетных данных и без порта по умолчанию.
+    :param link: str. Ссылка
+    :returns: str. Хост, например `example.com:8080`
+    """
+    parts = urlsplit(link)
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is not None and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+    return host
+
+
+def normalize_url(link: str) -> str:
+    """
+    Ссылка в каноническом виде для ключа кэша: схема и хост в нижнем регистре, без порта по умолчанию,
+    пустой путь заменяется на `/`, фрагмент отбрасывается — он не отправляется на сервер.
+    :param link: str. Ссылка
+    :returns: str. Нормализованная ссылка
+    """
+    parts = urlsplit(link)
+    return urlunsplit((parts.scheme.lower(), normalize_host(link), parts.path or "/", parts.query, ""))
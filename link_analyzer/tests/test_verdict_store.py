@@ -0,0 +1,85 @@
+import asyncio
+import socket
+import time
+
+import pytest
+from crud.clickhouse_client import ClickHouseDB
+from services import model
+from services.model import LinkModel
+from services.verdict_store import VerdictStore
+from services.virustotal_queue import VirustotalQueue
+from utils.token_bucket import FileTokenBucket
+from utils.urls import normalize_url
+from virustotal_stub import VirustotalStub
+
+TIMEOUT = 0.3
+
+
+@pytest.fixture
+def silent_port():
+    # Порт принимает соединения, но никогда не отвечает — как зависший ClickHouse
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        yield server.getsockname()[1]
+
+
+@pytest.fixture
+def store(silent_port, monkeypatch) -> VerdictStore:
+    store = VerdictStore(
+        db=ClickHouseDB(host="127.0.0.1", port=silent_port, username="default", password=""),
+        max_entries=100,
+        clean_ttl_seconds=60.0,
+        malicious_ttl_seconds=600.0,
+        miss_ttl_seconds=60.0,
+        connect_timeout=TIMEOUT,
+        query_timeout=TIMEOUT,
+    )
+    monkeypatch.setattr(model, "verdict_store", store)
+    return store
+
+
+@pytest.fixture
+def virustotal(tmp_path, monkeypatch):
+    limiter = FileTokenBucket(path=str(tmp_path / "virustotal.bucket"), rate_per_second=100.0, capacity=10.0)
+    queue = VirustotalQueue(limiter=limiter, max_size=10, max_attempts=3, retry_base_seconds=0.1)
+    monkeypatch.setattr(model, "virustotal_limiter", limiter)
+    monkeypatch.setattr(model, "virustotal_queue", queue)
+    with VirustotalStub() as stub:
+        yield stub
+
+
+def test_analyze_does_not_wait_for_silent_clickhouse(store: VerdictStore, virustotal: VirustotalStub):
+    link_model = LinkModel("key", check_timeout=1.0, virustotal_api_url=virustotal.url)
+    text = "see http://malicious.example.com/a and http://clean.example.com/b"
+
+    async def analyze():
+        return await link_model.analyze(text, False, False, False, True)
+
+    started = time.perf_counter()
+    metric, reasons = asyncio.run(analyze())
+
+    assert time.perf_counter() - started < 3 * link_model.check_timeout
+    assert metric == 1
+    assert text[reasons[0].start : reasons[0].stop] == "http://malicious.example.com/a"
+
+
+def test_misses_are_cached(store: VerdictStore):
+    link = "http://example.com/a"
+    assert asyncio.run(store.get(link)) is None
+
+    started = time.perf_counter()
+    assert asyncio.run(store.get(link)) is None
+    assert time.perf_counter() - started < TIMEOUT / 2
+    assert store.get_cached(normalize_url(link)).malicious is None
+
+
+def test_put_does_not_wait_for_clickhouse(store: VerdictStore):
+    link = "http://example.com/a"
+    assert asyncio.run(store.get(link)) is None
+
+    async def put():
+        started = time.perf_counter()
+        store.put(link, True)
+        return time.perf_counter() - started
+
+    assert asyncio.run(put()) < TIMEOUT / 2
+    assert asyncio.run(store.get(link)) is True
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from services import model
+from services.model import LinkModel
+from services.verdict_store import VerdictStore
+from services.virustotal_queue import VirustotalQueue
+from utils.token_bucket import FileTokenBucket
+from virustotal_stub import VirustotalStub
+
+TOKENS = 10.0
+
+
+class MemoryVerdictStore(VerdictStore):
+    """Хранилище вердиктов только с локальным кэшем"""
+
+    def load_verdict(self, url: str) -> bool | None:
+        return None
+
+    def save_verdict(self, verdict):
+        pass
+
+
+@pytest.fixture
+def limiter(tmp_path, monkeypatch) -> FileTokenBucket:
+    # Токены не пополняются: по остатку видно, сколько их израсходовано
+    limiter = FileTokenBucket(path=str(tmp_path / "virustotal.bucket"), rate_per_second=1e-9, capacity=TOKENS)
+    monkeypatch.setattr(model, "virustotal_limiter", limiter)
+    store = MemoryVerdictStore(
+        db=None,
+        max_entries=100,
+        clean_ttl_seconds=60.0,
+        malicious_ttl_seconds=600.0,
+        miss_ttl_seconds=60.0,
+        connect_timeout=1.0,
+        query_timeout=1.0,
+    )
+    monkeypatch.setattr(model, "verdict_store", store)
+    return limiter
+
+
+def get_tokens(limiter: FileTokenBucket) -> float:
+    return limiter.update(lambda tokens, refill_from, now: (tokens, refill_from, tokens))
+
+
+def make_queue(limiter: FileTokenBucket, monkeypatch) -> VirustotalQueue:
+    queue = VirustotalQueue(limiter=limiter, max_size=10, max_attempts=5, retry_base_seconds=0.05)
+    monkeypatch.setattr(model, "virustotal_queue", queue)
+    return queue
+
+
+async def wait_for_queue(queue: VirustotalQueue):
+    while queue.stats().depth:
+        await asyncio.sleep(0.01)
+
+
+def test_retries_only_poll_the_created_analysis(limiter: FileTokenBucket, monkeypatch):
+    queue = make_queue(limiter, monkeypatch)
+    text = "http://malicious.example.com/a"
+
+    with VirustotalStub(polls_until_completed=3) as stub:
+        link_model = LinkModel("key", check_timeout=5.0, virustotal_api_url=stub.url)
+
+        async def analyze_twice():
+            first = await link_model.analyze(text, False, False, False, True)
+            await asyncio.wait_for(wait_for_queue(queue), timeout=5.0)
+            return first, await link_model.analyze(text, False, False, False, True)
+
+        (first_metric, _), (second_metric, _) = asyncio.run(analyze_twice())
+
+    assert (first_metric, second_metric) == (0, 1)
+    assert stub.requests == [("POST", "/api/v3/urls")] + [("GET", "/api/v3/analyses/0")] * 3
+    assert get_tokens(limiter) == pytest.approx(TOKENS - len(stub.requests))
+    stats = queue.stats()
+    assert (stats.completed, stats.failed, stats.retried) == (1, 0, 1)
+
+
+def test_queued_link_is_submitted_once(limiter: FileTokenBucket, monkeypatch):
+    queue = make_queue(limiter, monkeypatch)
+
+    with VirustotalStub(polls_until_completed=1) as stub:
+        link_model = LinkModel("key", virustotal_api_url=stub.url)
+
+        async def scan():
+            queue.enqueue("http://clean.example.com/", link_model)
+            await asyncio.wait_for(wait_for_queue(queue), timeout=5.0)
+
+        asyncio.run(scan())
+
+    assert stub.requests == [("POST", "/api/v3/urls"), ("GET", "/api/v3/analyses/0")]
+    assert get_tokens(limiter) == pytest.approx(TOKENS - 2)
+    assert queue.stats().completed == 1
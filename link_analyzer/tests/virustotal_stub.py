@@ -0,0 +1,100 @@
+"""
+Локальная заглушка VirusTotal API v3 для проверки сервиса без доступа в интернет:
+`python tests/virustotal_stub.py 8081` и VIRUSTOTAL_API_URL=http://127.0.0.1:8081/api/v3.
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+from urllib.parse import parse_qs
+
+API_PATH = "/api/v3"
+
+
+class VirustotalStub:
+    """
+    POST /urls ставит ссылку на анализ, GET /analyses/{id} возвращает его результат. Вредоносными считаются ссылки,
+    в которых есть `malicious`. Анализ завершается после polls_until_completed запросов результата, до этого
+    его статус `queued`. Все запросы записываются в requests.
+    """
+
+    def __init__(self, port: int = 0, polls_until_completed: int = 1) -> None:
+        self.polls_until_completed = polls_until_completed
+        self.requests: List[Tuple[str, str]] = []
+        self.links: List[str] = []
+        self.polls: List[int] = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self.get_handler())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{API_PATH}"
+
+    def __enter__(self) -> "VirustotalStub":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def submit(self, link: str) -> dict:
+        with self.lock:
+            self.links.append(link)
+            self.polls.append(0)
+            return {"data": {"type": "analysis", "id": str(len(self.links) - 1)}}
+
+    def poll(self, analysis_id: str) -> dict | None:
+        with self.lock:
+            if not analysis_id.isdigit() or int(analysis_id) >= len(self.links):
+                return None
+            index = int(analysis_id)
+            self.polls[index] += 1
+            completed = self.polls[index] >= self.polls_until_completed
+            malicious = int(completed and "malicious" in self.links[index])
+        status = "completed" if completed else "queued"
+        return {"data": {"attributes": {"status": status, "stats": {"malicious": malicious, "harmless": 1}}}}
+
+    def get_handler(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status: int, body: dict | None):
+                content = json.dumps(body or {"error": {"code": "NotFoundError"}}).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_POST(self):
+                with stub.lock:
+                    stub.requests.append(("POST", self.path))
+                length = int(self.headers.get("content-length", 0))
+                link = parse_qs(self.rfile.read(length).decode()).get("url", [""])[0]
+                if self.path != f"{API_PATH}/urls" or not link:
+                    self.send_json(400, None)
+                    return
+                self.send_json(200, stub.submit(link))
+
+            def do_GET(self):
+                with stub.lock:
+                    stub.requests.append(("GET", self.path))
+                prefix = f"{API_PATH}/analyses/"
+                result = stub.poll(self.path[len(prefix) :]) if self.path.startswith(prefix) else None
+                self.send_json(200 if result else 404, result)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    with VirustotalStub(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8081) as stub:
+        print(f"VirusTotal stub at {stub.url}")
+        threading.Event().wait()
@@ -8,6 +8,9 @@ class Config(BaseSettings):
     
     alerting_endpoint: str
 
+    # Максимальная длина куска текста, который sqlparse группирует за один раз
+    sqlparse_max_chunk_chars: int = 10_000
+
     database: DatabaseConfig
 
 
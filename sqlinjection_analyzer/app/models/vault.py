@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 
 class Vault(BaseModel):
@@ -6,7 +6,12 @@ class Vault(BaseModel):
     dangerous_commands_output: List
     max_dangerous_commands_input: int
     max_dangerous_commands_output: int
-    use_py_find_injection: bool
     use_heuristics: bool
     use_sqlparse: bool
-    use_ast: bool
\ No newline at end of file
+    # Поиск по отпечаткам токенов (utils/sql_fingerprint.py)
+    use_fingerprints: bool = False
+    # Не используются, оставлены для совместимости с сохраненными сейфами
+    use_py_find_injection: bool = False
+    use_ast: bool = False
+    # Минимальное количество SQL-признаков в тексте для разбора sqlparse, 0 — разбирать всегда, как раньше
+    sqlparse_gate_threshold: int = Field(default=0, ge=0)
@@ -2,8 +2,10 @@ import json
 
 from fastapi import APIRouter, Depends, status
 from models.product import Product
-from routers import verify_api_key
+from routers import verify_admin_api_key, verify_api_key
+from schemas.sqlparse_gate import SqlparseGateStats
 from schemas.vault import VaultExample
+from services.sqlparse_gate import sqlparse_gate
 from services.vault_manager import Vault, vault_manager
 
 manager_router = APIRouter(prefix="/manager")
@@ -25,3 +27,13 @@ async def add_vault(
 async def get_vault_example():
     str_schema = json.dumps(Vault.model_json_schema())
     return VaultExample(vault_schema=str_schema)
+
+
+@manager_router.get(
+    "/sqlparse_gate_stats",
+    status_code=status.HTTP_200_OK,
+    response_model=SqlparseGateStats,
+    dependencies=[Depends(verify_admin_api_key)],
+)
+async def get_sqlparse_gate_stats():
+    return sqlparse_gate.stats()
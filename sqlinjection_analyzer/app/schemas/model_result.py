@@ -7,6 +7,8 @@ class Reason(BaseModel):
     start: int
     stop: int
     additional_metric: float | None = None
+    heuristic: str | None = None
+    fingerprint: str | None = None
 
 
 class ModelResult(BaseModel):
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class SqlparseGateStats(BaseModel):
+    checked: int
+    passed: int
+    hit_rate: float
+    gate_seconds: float
+    parse_seconds: float
+    saved_seconds: float
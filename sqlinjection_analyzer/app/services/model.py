@@ -1,10 +1,61 @@
+from core.config import PROJECT_PATH, main_config
 from models.vault import Vault
 from schemas.model_result import ModelResult, Reason
 import re
 import ast
+from time import perf_counter
 from typing import List, Tuple
 # from py_find_injection import Checker
 import sqlparse
+from services.sqlparse_gate import sqlparse_gate
+from utils.sql_chunks import iter_statements
+from utils.sql_fingerprint import FingerprintDetector, load_fingerprints
+
+# Выражения записаны в нижнем регистре и применяются к тексту, приведенному к нижнему регистру один раз:
+# без re.IGNORECASE движок ищет литеральный префикс выражения быстрым поиском подстроки
+SQL_INJECTION_PATTERNS = {
+    "or_1_eq_1": re.compile(r"or\s+1\s*=\s*1"),  # OR 1=1
+    "union_select": re.compile(r"union\s+select"),  # UNION SELECT
+    "comment": re.compile(r"--"),  # SQL Comment
+    "insert_into": re.compile(r"insert\s+into"),  # INSERT INTO
+    "drop_table": re.compile(r"drop\s+table"),  # DROP TABLE
+    "information_schema": re.compile(r"select\s.*from\s.*information_schema"),  # Access to information_schema
+    "dynamic_parameter": re.compile(r"\$\w+\[.*\]"),  # Dynamic GET/POST/COOKIE parameters
+    "exec": re.compile(r"exec\s"),  # EXEC/EXECUTE statements
+}
+FINGERPRINT_DETECTOR = FingerprintDetector(load_fingerprints(PROJECT_PATH / "data" / "sqli_fingerprints.txt"))
+# Символы, которые re.IGNORECASE считает равными латинским буквам, но lower() к ним не приводит
+CASE_FOLDS = str.maketrans({"ſ": "s", "ı": "i"})
+
+
+def fold_case(text: str) -> str | None:
+    """
+    Приведение текста к нижнему регистру с сохранением позиций символов.
+    :param text: str. Исходный текст
+    :returns: str | None. Текст в нижнем регистре или None, если lower() изменил длину текста
+    """
+    folded = text.lower()
+    if len(folded) != len(text):
+        return None
+    if "ſ" in folded or "ı" in folded:
+        folded = folded.translate(CASE_FOLDS)
+    return folded
+
+
+def find_command(text: str, folded: str | None, command: str, start: int, stop: int) -> int:
+    """
+    Поиск команды без учета регистра в заданном диапазоне текста.
+    :param text: str. Исходный текст
+    :param folded: str | None. Результат fold_case для текста
+    :param command: str. Команда в нижнем регистре
+    :param start: int. Начало диапазона
+    :param stop: int. Конец диапазона
+    :returns: int. Позиция команды в исходном тексте или -1
+    """
+    if folded is not None:
+        return folded.find(command, start, stop)
+    match = re.compile(re.escape(command), re.IGNORECASE).search(text, start, stop)
+    return match.start() if match else -1
 
 
 class SQLInjectionModel:
@@ -15,7 +66,8 @@ class SQLInjectionModel:
     def input_score(self, text: str, vault: Vault) -> ModelResult:
         metric, reasons = self.detect_sql_injection(text,
                                                     vault,
-                                                    dangerous_commands=vault.dangerous_commands_input)
+                                                    dangerous_commands=vault.dangerous_commands_input,
+                                                    max_dangerous_commands=vault.max_dangerous_commands_input)
         reject_flg = metric > vault.max_dangerous_commands_input
 
         model_output = ModelResult(
@@ -27,7 +79,8 @@ class SQLInjectionModel:
     def output_score(self, text: str, vault: Vault) -> ModelResult:
         metric, reasons = self.detect_sql_injection(text,
                                                     vault,
-                                                    dangerous_commands=vault.dangerous_commands_output)
+                                                    dangerous_commands=vault.dangerous_commands_output,
+                                                    max_dangerous_commands=vault.max_dangerous_commands_output)
         reject_flg = metric > vault.max_dangerous_commands_output
 
         model_output = ModelResult(
@@ -40,18 +93,27 @@ class SQLInjectionModel:
         self, 
         input_text: str,
         vault: Vault,
-        dangerous_commands: List=['drop', 'delete', 'insert', 'update', 'union', 'exec', 'execute']
+        dangerous_commands: List=['drop', 'delete', 'insert', 'update', 'union', 'exec', 'execute'],
+        max_dangerous_commands: int | None = None,
         ) -> Tuple[int, List[Reason]]:
         """
         Проверка на SQL инъекцию с использованием py-find-injection, эвристического анализа и sqlparse.
+        Разбор sqlparse останавливается, как только находок становится больше max_dangerous_commands:
+        дальнейший разбор не меняет решение.
         """
         vulnerabilities = []
         # if vault.use_py_find_injection or vault.use_ast:
         #     vulnerabilities.extend(self.analyze_with_py_find_injection(input_text))
+        if vault.use_fingerprints:
+            vulnerabilities.extend(self.analyze_with_fingerprints(input_text))
         if vault.use_heuristics:
             vulnerabilities.extend(self.analyze_with_heuristics(input_text))
-        if vault.use_sqlparse:
-            vulnerabilities.extend(self.analyze_with_sqlparse(input_text, dangerous_commands))
+        max_reasons = None if max_dangerous_commands is None else max_dangerous_commands + 1 - len(vulnerabilities)
+        reasons_left = max_reasons is None or max_reasons > 0
+        if vault.use_sqlparse and reasons_left and sqlparse_gate.allows(input_text, vault.sqlparse_gate_threshold):
+            started = perf_counter()
+            vulnerabilities.extend(self.analyze_with_sqlparse(input_text, dangerous_commands, max_reasons))
+            sqlparse_gate.record_parse(input_text, perf_counter() - started)
 
         return len(vulnerabilities), vulnerabilities
     
@@ -70,51 +132,88 @@ class SQLInjectionModel:
     #         print(e)     
     #     return vulnerabilities
 
+    @staticmethod
+    def analyze_with_fingerprints(input_text: str) -> List[Reason]:
+        """
+        Поиск SQL инъекций по отпечаткам токенов в стиле libinjection.
+        """
+        return [
+            Reason(start=start, stop=stop, fingerprint=fingerprint)
+            for start, stop, fingerprint in FINGERPRINT_DETECTOR.iter_matches(input_text)
+        ]
+
     @staticmethod
     def analyze_with_heuristics(input_text: str) -> List[Reason]:
         """
         Эвристический анализ текста на SQL инъекции.
+        Выражения скомпилированы при импорте, текст приводится к нижнему регистру один раз.
         """
         vulnerabilities = []
-        sql_injection_patterns = [
-            r"or\s+1\s*=\s*1",  # OR 1=1
-            r"union\s+select",  # UNION SELECT
-            r"--",  # SQL Comment
-            r"insert\s+into",  # INSERT INTO
-            r"drop\s+table",  # DROP TABLE
-            r"select\s.*from\s.*information_schema",  # Access to information_schema
-            r"\$\w+\[.*\]",  # Dynamic GET/POST/COOKIE parameters
-            r"exec\s",  # EXEC/EXECUTE statements
-        ]
-
-        for pattern in sql_injection_patterns:
-            for match in re.finditer(pattern, input_text, re.IGNORECASE):
-                vulnerabilities.append(Reason(start=match.start(), stop=match.end()))
+        folded = fold_case(input_text)
+        for heuristic, pattern in SQL_INJECTION_PATTERNS.items():
+            if folded is not None:
+                matches = pattern.finditer(folded)
+            else:
+                matches = re.finditer(pattern.pattern, input_text, re.IGNORECASE)
+            for match in matches:
+                vulnerabilities.append(Reason(start=match.start(), stop=match.end(), heuristic=heuristic))
 
         return vulnerabilities
     
     @staticmethod
-    def analyze_with_sqlparse(input_text: str, dangerous_commands: List) -> List[Reason]:
+    def analyze_with_sqlparse(
+        input_text: str, dangerous_commands: List, max_reasons: int | None = None
+    ) -> List[Reason]:
         """
         Использование sqlparse для анализа опасных SQL-конструкций, таких как UNION SELECT, DROP, и комментарии.
+        Текст разбирается потоково по выражениям, длинные выражения — кусками не длиннее
+        sqlparse_max_chunk_chars. Значения токенов верхнего уровня в сумме дают выражение, поэтому позиция
+        каждого токена накапливается при обходе, а опасная команда ищется только внутри своего токена.
+        Разбор прекращается, когда найдено max_reasons находок.
         """
         vulnerabilities = []
+        folded = fold_case(input_text)
         try:
-            parsed = sqlparse.parse(input_text)
-            for stmt in parsed:
-                for token in stmt.tokens:
-                    if token.ttype is None and isinstance(token, sqlparse.sql.TokenList):
-                        value = token.value.lower()
-                        for cmd in dangerous_commands:
-                            if cmd in value:
-                                absolute_pos = input_text.lower().find(cmd)
-                                if absolute_pos != -1:
-                                    vulnerabilities.append(Reason(start=absolute_pos, stop=absolute_pos + len(cmd)))
-
-                    if token.ttype == sqlparse.tokens.Comment.Single or token.ttype == sqlparse.tokens.Keyword.DML:
-                        absolute_pos = input_text.lower().find(token.value.lower())
-                        if absolute_pos != -1:
-                            vulnerabilities.append(Reason(start=absolute_pos, stop=absolute_pos + len(token.value)))
+            for position, stmt in iter_statements(input_text, main_config.sqlparse_max_chunk_chars):
+                vulnerabilities.extend(
+                    SQLInjectionModel._analyze_statement(input_text, folded, position, stmt, dangerous_commands)
+                )
+                if max_reasons is not None and len(vulnerabilities) >= max_reasons:
+                    return vulnerabilities[:max_reasons]
         except Exception as e:
             print(e)
-        return vulnerabilities
\ No newline at end of file
+        return vulnerabilities
+
+    @staticmethod
+    def _analyze_statement(
+        input_text: str, folded: str | None, position: int, stmt: sqlparse.sql.Statement, dangerous_commands: List
+    ) -> List[Reason]:
+        """
+        Находки в одном выражении: опасные команды внутри сгруппированных токенов, комментарии и DML.
+        """
+        vulnerabilities = []
+        for token in stmt.tokens:
+            stop = position + len(token.value)
+            if token.ttype is None and isinstance(token, sqlparse.sql.TokenList):
+                vulnerabilities.extend(
+                    SQLInjectionModel._find_dangerous_commands(input_text, folded, dangerous_commands, position, stop)
+                )
+            if SQLInjectionModel._is_comment_or_dml(token):
+                vulnerabilities.append(Reason(start=position, stop=stop))
+            position = stop
+        return vulnerabilities
+
+    @staticmethod
+    def _find_dangerous_commands(
+        input_text: str, folded: str | None, dangerous_commands: List, start: int, stop: int
+    ) -> List[Reason]:
+        vulnerabilities = []
+        for cmd in dangerous_commands:
+            cmd_pos = find_command(input_text, folded, cmd, start, stop)
+            if cmd_pos != -1:
+                vulnerabilities.append(Reason(start=cmd_pos, stop=cmd_pos + len(cmd)))
+        return vulnerabilities
+
+    @staticmethod
+    def _is_comment_or_dml(token: sqlparse.sql.Token) -> bool:
+        return token.ttype == sqlparse.tokens.Comment.Single or token.ttype == sqlparse.tokens.Keyword.DML
@@ -0,0 +1,75 @@
+from threading import Lock
+from time import perf_counter
+
+from schemas.sqlparse_gate import SqlparseGateStats
+from utils.sql_gate import score_sql_likelihood
+
+# Вес нового замера в скользящей оценке времени разбора одного символа
+PARSE_RATE_SMOOTHING = 0.1
+
+
+class SqlparseGate:
+    """
+    Фильтр перед sqlparse: полный разбор запускается только для текстов, похожих на SQL.
+    Считает долю пропущенных в разбор текстов и сэкономленное время. Время разбора пропущенного текста
+    оценивается по скользящему среднему времени разбора одного символа.
+    """
+
+    def __init__(self) -> None:
+        self.checked = 0
+        self.passed = 0
+        self.gate_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.saved_seconds = 0.0
+        self.parse_seconds_per_char: float | None = None
+        self.lock = Lock()
+
+    def allows(self, text: str, threshold: int) -> bool:
+        """
+        Проверка, нужно ли разбирать текст с помощью sqlparse.
+        :param text: str. Исходный текст
+        :param threshold: int. Минимальное количество SQL-признаков, 0 — разбирать всегда
+        :returns: bool. True, если текст нужно разобрать
+        """
+        started = perf_counter()
+        passed = threshold <= 0 or score_sql_likelihood(text) >= threshold
+        gate_seconds = perf_counter() - started
+
+        with self.lock:
+            self.checked += 1
+            self.gate_seconds += gate_seconds
+            if passed:
+                self.passed += 1
+            elif self.parse_seconds_per_char is not None:
+                self.saved_seconds += len(text) * self.parse_seconds_per_char - gate_seconds
+        return passed
+
+    def record_parse(self, text: str, seconds: float):
+        """
+        Учет времени полного разбора текста.
+        :param text: str. Разобранный текст
+        :param seconds: float. Время разбора
+        """
+        if not text:
+            return
+        with self.lock:
+            self.parse_seconds += seconds
+            rate = seconds / len(text)
+            if self.parse_seconds_per_char is None:
+                self.parse_seconds_per_char = rate
+            else:
+                self.parse_seconds_per_char += PARSE_RATE_SMOOTHING * (rate - self.parse_seconds_per_char)
+
+    def stats(self) -> SqlparseGateStats:
+        with self.lock:
+            return SqlparseGateStats(
+                checked=self.checked,
+                passed=self.passed,
+                hit_rate=self.passed / self.checked if self.checked else 0.0,
+                gate_seconds=self.gate_seconds,
+                parse_seconds=self.parse_seconds,
+                saved_seconds=self.saved_seconds,
+            )
+
+
+sqlparse_gate = SqlparseGate()
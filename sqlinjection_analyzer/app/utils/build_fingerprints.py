@@ -0,0 +1,84 @@
+"""
+Сборка множества отпечатков SQL-инъекций из корпуса data/sqli_payloads.txt:
+`python utils/build_fingerprints.py` из директории app. Результат data/sqli_fingerprints.txt хранится в репозитории.
+Корпус data/sqli_payloads_holdout.txt в сборку не входит: на нем после сборки печатается полнота обнаружения.
+"""
+
+from pathlib import Path
+from typing import Iterable, List, Set
+
+from sql_fingerprint import (
+    MIN_FINGERPRINT_LENGTH,
+    MIN_QUOTE_FINGERPRINT_LENGTH,
+    QUOTE_PATTERN,
+    FingerprintDetector,
+    fold_tokens,
+    get_fingerprint,
+    get_quote_context,
+    iter_tokens,
+)
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data"
+PAYLOADS_FILE_NAME = "sqli_payloads.txt"
+HOLDOUT_FILE_NAME = "sqli_payloads_holdout.txt"
+FINGERPRINTS_FILE_NAME = "sqli_fingerprints.txt"
+
+
+def build_fingerprints(payloads: Iterable[str]) -> Set[str]:
+    """
+    Отпечатки корпуса. Нагрузка разбирается так, как ее видит FingerprintDetector: если перед первой кавычкой
+    одно значение без пробелов, то как выход из строкового литерала, иначе как есть.
+    :param payloads: Iterable[str]. Примеры инъекций
+    :returns: Set[str]. Отпечатки
+    """
+    fingerprints = set()
+    for payload in payloads:
+        quote = QUOTE_PATTERN.search(payload)
+        if quote is None or any(char.isspace() for char in payload[: quote.start()]):
+            tokens = fold_tokens(payload, list(iter_tokens(payload)))
+            fingerprint, min_length = get_fingerprint(tokens), MIN_FINGERPRINT_LENGTH
+        else:
+            fingerprint = get_fingerprint(get_quote_context(payload, quote.start()))
+            min_length = MIN_QUOTE_FINGERPRINT_LENGTH
+        if len(fingerprint) >= min_length:
+            fingerprints.add(fingerprint)
+    return fingerprints
+
+
+def read_payloads(path: Path) -> List[str]:
+    with open(path, "r") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def get_missed_payloads(fingerprints: Set[str], payloads: Iterable[str]) -> List[str]:
+    """
+    Нагрузки, которые детектор не находит внутри обычного текста.
+    :param fingerprints: Set[str]. Отпечатки
+    :param payloads: Iterable[str]. Примеры инъекций, не участвовавшие в сборке
+    :returns: List[str]. Пропущенные нагрузки
+    """
+    detector = FingerprintDetector(fingerprints)
+    return [
+        payload
+        for payload in payloads
+        if next(detector.iter_matches(f"Please check my login form, the name was {payload} and it failed."), None)
+        is None
+    ]
+
+
+def main():
+    fingerprints = build_fingerprints(read_payloads(DATA_PATH / PAYLOADS_FILE_NAME))
+    with open(DATA_PATH / FINGERPRINTS_FILE_NAME, "w") as f:
+        f.write(f"// generated by utils/build_fingerprints.py from {PAYLOADS_FILE_NAME}\n")
+        for fingerprint in sorted(fingerprints):
+            f.write(f"{fingerprint}\n")
+
+    holdout = read_payloads(DATA_PATH / HOLDOUT_FILE_NAME)
+    missed = get_missed_payloads(fingerprints, holdout)
+    print(f"{HOLDOUT_FILE_NAME}: detected {len(holdout) - len(missed)} of {len(holdout)}")
+    for payload in missed:
+        print(f"  missed: {payload}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from typing import Iterator, Tuple
+
+from sqlparse import lexer, sql
+from sqlparse import tokens as T
+from sqlparse.engine import grouping
+
+
+def iter_statements(text: str, max_chunk_chars: int) -> Iterator[Tuple[int, sql.Statement]]:
+    """
+    Потоковый разбор текста: токены лексера собираются в выражения до точки с запятой, но не длиннее
+    max_chunk_chars (длинное выражение режется по границе токена), и каждое выражение группируется отдельно.
+    В памяти одновременно находится дерево только одного выражения, поэтому память не зависит от длины текста.
+    :param text: str. Исходный текст
+    :param max_chunk_chars: int. Максимальная длина группируемого выражения
+    :returns: Iterator[Tuple[int, Statement]]. Позиция выражения в тексте и сгруппированное выражение
+    """
+    position = 0
+    chunk, chunk_length = [], 0
+    statement_ended = False
+    for ttype, value in lexer.tokenize(text):
+        # Как в sqlparse.split, пробелы и однострочный комментарий после точки с запятой остаются в выражении
+        statement_done = statement_ended and not (ttype in T.Whitespace or ttype in T.Comment.Single)
+        chunk_full = chunk_length >= max_chunk_chars
+        if statement_done or chunk_full:
+            yield position, grouping.group(sql.Statement(chunk))
+            position += chunk_length
+            chunk, chunk_length = [], 0
+            statement_ended = False
+        chunk.append(sql.Token(ttype, value))
+        chunk_length += len(value)
+        if ttype is T.Punctuation and value == ";":
+            statement_ended = True
+    if chunk:
+        yield position, grouping.group(sql.Statement(chunk))
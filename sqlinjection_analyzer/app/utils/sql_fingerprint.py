@@ -0,0 +1,331 @@
+"""
+Отпечатки SQL-инъекций в духе libinjection: текст разбивается на токены, каждый токен заменяется
+одним символом класса, первые токены после свертки образуют отпечаток, например `s&1c`
+(строка, логический оператор, число, комментарий). Отпечаток проверяется по множеству известных отпечатков.
+"""
+
+import re
+from pathlib import Path
+from typing import FrozenSet, Iterator, List, NamedTuple, Tuple
+
+MAX_FINGERPRINT_LENGTH = 5
+# Отпечатки короче этой длины слишком часто встречаются в обычном тексте
+MIN_FINGERPRINT_LENGTH = 4
+# После кавычки отпечаток может быть короче: `admin'--` дает `sc`
+MIN_QUOTE_FINGERPRINT_LENGTH = 2
+# Сколько кавычек в тексте проверяется как возможный выход из строкового литерала
+MAX_QUOTE_CONTEXTS = 256
+# Сколько токенов разбирается после кавычки, чтобы после свертки осталось не меньше MAX_FINGERPRINT_LENGTH
+QUOTE_CONTEXT_TOKENS = 4 * MAX_FINGERPRINT_LENGTH
+# Сколько символов перед кавычкой может занимать подставленное значение
+MAX_QUOTE_PREFIX = 64
+# Сколько символов после кавычки разбирается: незакрытая строка иначе тянется до конца текста у каждой кавычки
+MAX_QUOTE_SUFFIX = 256
+QUOTE_PATTERN = re.compile(r"['\"]")
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    |(?P<comment>--[^\n]*|\#[^\n]*|/\*(?:.*?\*/|.*))
+    |(?P<string>'(?:[^'\\]|\\.|'')*'?|"(?:[^"\\]|\\.|"")*"?)
+    |(?P<backtick>`[^`]*`?)
+    |(?P<number>0x[0-9a-f]+|(?:\d+(?:\.\d*)?|\.\d+)(?:e[+-]?\d+)?)
+    |(?P<variable>@@?[\w$.]+)
+    |(?P<word>[^\W\d][\w$]*)
+    |(?P<logic>&&|\|\|)
+    |(?P<operator>:=|<=>|<>|!=|<=|>=|<<|>>|[=<>+\-*/%&|^~!])
+    |(?P<punctuation>[(),;.])
+    |(?P<other>.)
+    """,
+    re.VERBOSE | re.IGNORECASE | re.DOTALL,
+)
+FUNCTION_CALL = re.compile(r"\s*\(")
+
+GROUP_TYPES = {
+    "comment": "c",
+    "string": "s",
+    "backtick": "n",
+    "number": "1",
+    "variable": "v",
+    "logic": "&",
+    "operator": "o",
+}
+WORD_TYPES = {
+    **dict.fromkeys(["union", "intersect", "except"], "U"),
+    **dict.fromkeys(
+        [
+            "select",
+            "insert",
+            "update",
+            "delete",
+            "drop",
+            "create",
+            "alter",
+            "truncate",
+            "replace",
+            "merge",
+            "exec",
+            "execute",
+            "declare",
+            "call",
+            "grant",
+            "revoke",
+            "shutdown",
+            "waitfor",
+        ],
+        "E",
+    ),
+    **dict.fromkeys(["and", "or", "xor"], "&"),
+    **dict.fromkeys(["not", "like", "rlike", "regexp", "is", "in", "div", "mod", "between", "escape"], "o"),
+    **dict.fromkeys(
+        [
+            "from",
+            "where",
+            "group",
+            "order",
+            "by",
+            "having",
+            "limit",
+            "offset",
+            "into",
+            "values",
+            "set",
+            "join",
+            "on",
+            "as",
+            "case",
+            "when",
+            "then",
+            "else",
+            "end",
+            "table",
+            "procedure",
+            "top",
+            "distinct",
+            "all",
+            "delay",
+            "outfile",
+            "dumpfile",
+            "asc",
+            "desc",
+        ],
+        "k",
+    ),
+    **dict.fromkeys(["null", "true", "false"], "1"),
+}
+# Имена функций считаются функциями только перед скобкой: «user», «version», «if» часто встречаются в тексте
+FUNCTIONS = frozenset(
+    [
+        "sleep",
+        "pg_sleep",
+        "benchmark",
+        "char",
+        "chr",
+        "concat",
+        "concat_ws",
+        "group_concat",
+        "version",
+        "database",
+        "user",
+        "current_user",
+        "system_user",
+        "schema",
+        "substring",
+        "substr",
+        "mid",
+        "ascii",
+        "ord",
+        "count",
+        "cast",
+        "convert",
+        "load_file",
+        "if",
+        "ifnull",
+        "isnull",
+        "coalesce",
+        "length",
+        "md5",
+        "sha1",
+        "hex",
+        "unhex",
+        "extractvalue",
+        "updatexml",
+        "randomblob",
+        "floor",
+        "rand",
+        "exp",
+    ]
+)
+UNARY_OPERATORS = frozenset("+-~!")
+# Типы токенов, после которых оператор из UNARY_OPERATORS является унарным
+UNARY_CONTEXT = frozenset("o&(,kEU")
+
+
+class SqlToken(NamedTuple):
+    type: str
+    start: int
+    stop: int
+
+
+def iter_tokens(text: str, position: int = 0, end: int | None = None) -> Iterator[SqlToken]:
+    """
+    Разбор текста на токены с классами в стиле libinjection и абсолютными позициями.
+    Пробелы и символы, не относящиеся к SQL, пропускаются.
+    :param text: str. Исходный текст
+    :param position: int. Позиция, с которой начинается разбор
+    :param end: int | None. Позиция, дальше которой разбор не заглядывает; None — до конца текста
+    :returns: Iterator[SqlToken]. Токены
+    """
+    end = len(text) if end is None else min(end, len(text))
+    while position < end:
+        match = TOKEN_PATTERN.match(text, position, end)
+        position = match.end()
+        group = match.lastgroup
+        if group in ("space", "other"):
+            continue
+        if group == "punctuation":
+            token_type = match.group()
+        elif group == "word":
+            word = match.group().lower()
+            if word in FUNCTIONS and FUNCTION_CALL.match(text, position):
+                token_type = "f"
+            else:
+                token_type = WORD_TYPES.get(word, "n")
+        else:
+            token_type = GROUP_TYPES[group]
+        yield SqlToken(token_type, match.start(), position)
+
+
+def is_unary_operator(text: str, token: SqlToken, previous: SqlToken | None) -> bool:
+    if token.type != "o" or text[token.start : token.stop] not in UNARY_OPERATORS:
+        return False
+    return previous is None or previous.type in UNARY_CONTEXT
+
+
+def continues_name(text: str, token: SqlToken, previous: SqlToken | None) -> bool:
+    # Имя через точку, например `schema.table`, продолжает предыдущее имя
+    if previous is None or token.type != "n" or previous.type != "n":
+        return False
+    return text[previous.stop : token.start] == "."
+
+
+def fold_tokens(text: str, tokens: List[SqlToken]) -> List[SqlToken]:
+    """
+    Свертка токенов: соседние строки и операторы объединяются, унарные операторы отбрасываются,
+    имена через точку схлопываются в одно имя, остальные точки отбрасываются.
+    :param text: str. Исходный текст
+    :param tokens: List[SqlToken]. Токены
+    :returns: List[SqlToken]. Свернутые токены
+    """
+    folded: List[SqlToken] = []
+    for token in tokens:
+        previous = folded[-1] if folded else None
+        if token.type == ".":
+            continue
+        if previous is not None and token.type == previous.type and token.type in "so":
+            folded[-1] = previous._replace(stop=token.stop)
+        elif is_unary_operator(text, token, previous):
+            continue
+        elif continues_name(text, token, previous):
+            folded[-1] = previous._replace(stop=token.stop)
+        else:
+            folded.append(token)
+    return folded
+
+
+def get_fingerprint(tokens: List[SqlToken]) -> str:
+    return "".join(token.type for token in tokens[:MAX_FINGERPRINT_LENGTH])
+
+
+def get_quote_context(text: str, quote_position: int) -> List[SqlToken]:
+    """
+    Токены текста в предположении, что кавычка закрывает строковый литерал, в который подставлен ввод:
+    ввод до кавычки становится строкой, дальше текст разбирается как SQL.
+    :param text: str. Исходный текст
+    :param quote_position: int. Позиция кавычки
+    :returns: List[SqlToken]. Свернутые токены, начиная со строки
+    """
+    start = quote_position
+    while start > max(0, quote_position - MAX_QUOTE_PREFIX) and not text[start - 1].isspace():
+        start -= 1
+    tokens = [SqlToken("s", start, quote_position + 1)]
+    for token in iter_tokens(text, quote_position + 1, quote_position + 1 + MAX_QUOTE_SUFFIX):
+        tokens.append(token)
+        if len(tokens) > QUOTE_CONTEXT_TOKENS:
+            break
+    return fold_tokens(text, tokens)
+
+
+def load_fingerprints(path: Path) -> FrozenSet[str]:
+    """
+    Чтение известных отпечатков инъекций, собранных utils/build_fingerprints.py.
+    :param path: Path. Путь к файлу отпечатков
+    :returns: FrozenSet[str]. Отпечатки
+    """
+    with open(path, "r") as f:
+        return frozenset(line.strip() for line in f if line.strip() and not line.startswith("//"))
+
+
+class FingerprintDetector:
+    """
+    Поиск SQL-инъекций по отпечаткам. Текст разбирается один раз, отпечаток строится от каждого токена
+    и проверяется по множеству известных отпечатков; дополнительно каждая кавычка проверяется
+    как выход из строкового литерала.
+    """
+
+    def __init__(self, fingerprints: FrozenSet[str]):
+        self.fingerprints = fingerprints
+
+    def match_prefix(self, tokens: List[SqlToken], start: int, min_length: int) -> int:
+        """
+        Длина самого длинного отпечатка из множества, начинающегося с токена start.
+        :returns: int. Количество токенов отпечатка или 0
+        """
+        fingerprint = get_fingerprint(tokens[start : start + MAX_FINGERPRINT_LENGTH])
+        for length in range(len(fingerprint), min_length - 1, -1):
+            if fingerprint[:length] in self.fingerprints:
+                return length
+        return 0
+
+    def iter_token_matches(self, text: str, tokens: List[SqlToken]) -> Iterator[Tuple[int, int, str]]:
+        """
+        Отпечатки, начинающиеся с токенов текста; совпавшие токены пропускаются.
+        """
+        i = 0
+        while i < len(tokens):
+            length = self.match_prefix(tokens, i, MIN_FINGERPRINT_LENGTH)
+            if length:
+                window = tokens[i : i + length]
+                yield window[0].start, window[-1].stop, get_fingerprint(window)
+            i += length or 1
+
+    def iter_quote_matches(self, text: str, raw_tokens: List[SqlToken]) -> Iterator[Tuple[int, int, str]]:
+        """
+        Отпечатки после кавычек в предположении выхода из строкового литерала. Короткие отпечатки проверяются
+        только у кавычек, открывающих строку: закрывающая кавычка в `"no" -- ...` иначе дала бы `sc`.
+        """
+        string_starts = {token.start for token in raw_tokens if token.type == "s"}
+        for _, quote in zip(range(MAX_QUOTE_CONTEXTS), QUOTE_PATTERN.finditer(text)):
+            context = get_quote_context(text, quote.start())
+            min_length = MIN_QUOTE_FINGERPRINT_LENGTH if quote.start() in string_starts else MIN_FINGERPRINT_LENGTH
+            length = self.match_prefix(context, 0, min_length)
+            if length:
+                window = context[:length]
+                yield window[0].start, window[-1].stop, get_fingerprint(window)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Поиск фрагментов текста, отпечаток которых совпадает с известным отпечатком инъекции.
+        :param text: str. Исходный текст
+        :returns: Iterator[Tuple[int, int, str]]. Кортежи (начало, конец, отпечаток), отсортированные по началу
+        """
+        raw_tokens = list(iter_tokens(text))
+        matches = list(self.iter_token_matches(text, fold_tokens(text, raw_tokens)))
+        matches.extend(self.iter_quote_matches(text, raw_tokens))
+
+        # Совпадения, целиком вложенные в более раннее, отбрасываются
+        last_stop = -1
+        for start, stop, fingerprint in sorted(matches, key=lambda match: (match[0], -match[1])):
+            if stop > last_stop:
+                last_stop = stop
+                yield start, stop, fingerprint
@@ -0,0 +1,58 @@
+import re
+
+# Ключевые слова, которые почти не встречаются в обычном тексте
+RARE_SQL_KEYWORDS = frozenset(
+    {
+        "union",
+        "waitfor",
+        "benchmark",
+        "pg_sleep",
+        "information_schema",
+        "xp_cmdshell",
+        "load_file",
+        "outfile",
+        "sysobjects",
+    }
+)
+# Обычные английские слова, которые являются признаком SQL только рядом с кавычками, комментариями или операторами
+COMMON_SQL_KEYWORDS = frozenset(
+    {
+        "select",
+        "insert",
+        "update",
+        "delete",
+        "drop",
+        "alter",
+        "create",
+        "truncate",
+        "exec",
+        "execute",
+        "declare",
+        "values",
+        "having",
+        "sleep",
+    }
+)
+# Кавычки, маркеры комментариев и операторы
+SQL_SYMBOLS = frozenset({"--", "/*", ";", "'", '"', "`", "<>", "!=", "<=", ">=", "=", "||"})
+# Слова и символы извлекаются одним проходом
+GATE_TOKEN_PATTERN = re.compile(r"[a-z_]+|--|/\*|;|'|\"|`|<>|!=|[<>]=|=|\|\|")
+
+
+def score_sql_likelihood(text: str) -> int:
+    """
+    Дешевая оценка того, что в тексте есть SQL: количество различных редких ключевых слов,
+    кавычек, маркеров комментариев и операторов. Обычные ключевые слова (select, update, create...)
+    учитываются, только если в тексте есть хотя бы один символьный признак.
+    :param text: str. Исходный текст
+    :returns: int. Количество различных SQL-признаков
+    """
+    keywords, symbols = set(), set()
+    for token in GATE_TOKEN_PATTERN.findall(text.lower()):
+        if token in SQL_SYMBOLS:
+            symbols.add(token)
+        elif token in RARE_SQL_KEYWORDS or token in COMMON_SQL_KEYWORDS:
+            keywords.add(token)
+    if not symbols:
+        keywords &= RARE_SQL_KEYWORDS
+    return len(keywords) + len(symbols)
@@ -9,4 +9,6 @@ class Vault(BaseModel):
     use_bs4_input: bool
     use_bs4_output: bool
     max_allowed_xss_input: int
-    max_allowed_xss_output: int
\ No newline at end of file
+    max_allowed_xss_output: int
+    # Поиск по тексту с раскрытыми HTML-сущностями, percent-encoding и JS-экранированием
+    use_decoding: bool = False
\ No newline at end of file
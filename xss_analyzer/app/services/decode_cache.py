@@ -0,0 +1,68 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from core.config import main_config
+from utils.xss_normalizer import DecodedText, decode_text, has_escapes
+
+
+class DecodeCache:
+    """
+    LRU-кэш декодированных текстов по хэшу содержимого, ограниченный суммарным размером в байтах.
+    Текст без экранирования не декодируется и не кэшируется: проверка дешевле хэширования.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.texts: OrderedDict[bytes, DecodedText] = OrderedDict()
+        self.lock = Lock()
+
+    @staticmethod
+    def get_size(decoded: DecodedText) -> int:
+        anchors = decoded.decoded_positions
+        return len(decoded.text) + 2 * len(anchors) * anchors.itemsize
+
+    def decode(self, text: str) -> DecodedText:
+        """
+        Декодирование текста с использованием кэша.
+        :param text: str. Исходный текст
+        :returns: DecodedText. Декодированный текст и карта позиций в исходный текст
+        """
+        if not has_escapes(text):
+            return DecodedText(text)
+
+        key = hashlib.blake2b(text.encode(errors="surrogatepass"), digest_size=16).digest()
+        decoded = self.get(key)
+        if decoded is None:
+            decoded = decode_text(text)
+            if decoded.decoded_positions is not None:
+                self.put(key, decoded)
+        return decoded
+
+    def get(self, key: bytes) -> Optional[DecodedText]:
+        with self.lock:
+            decoded = self.texts.get(key)
+            if decoded is not None:
+                self.texts.move_to_end(key)
+            return decoded
+
+    def put(self, key: bytes, decoded: DecodedText) -> None:
+        """
+        Добавление текста в кэш с вытеснением самых давно использованных. Текст больше всего кэша не сохраняется.
+        """
+        decoded_size = self.get_size(decoded)
+        if decoded_size > self.max_bytes:
+            return
+
+        with self.lock:
+            if key not in self.texts:
+                self.texts[key] = decoded
+                self.size += decoded_size
+            while self.size > self.max_bytes:
+                _, evicted = self.texts.popitem(last=False)
+                self.size -= self.get_size(evicted)
+
+
+decode_cache = DecodeCache(max_bytes=main_config.decode_cache_max_bytes)
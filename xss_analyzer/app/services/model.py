@@ -1,40 +1,68 @@
+from core.config import PROJECT_PATH
 from models.vault import Vault
+from services.decode_cache import decode_cache
 from schemas.model_result import ModelResult, Reason
-import re
 from typing import List, Tuple
-from bs4 import BeautifulSoup
-
-XSS_PAYLOADS = [
-    '"><svg/onload=alert(1)>',
-    '\'><svg/onload=alert(1)>',
-    '<img src=x onerror=alert(1)>',
-    '"><img src=x onerror=alert(1)>',
-    '\'><img src=x onerror=alert(1)>',
-    "';alert(String.fromCharCode(88,83,83))//';alert(String.fromCharCode(88,83,83))//--></script>",
-    "<Script>alert('XSS')</scripT>",
-    "<script>alert(document.cookie)</script>",
-]
+from utils.aho_corasick import AhoCorasick
+from utils.gap_pattern import GapPattern
+from utils.html_scanner import ScriptElement, iter_html_events
+from utils.xss_normalizer import DecodedText
+
+
+def load_payloads() -> List[str]:
+    """
+    Чтение словаря XSS-нагрузок, по одной на строку.
+    """
+    with open(PROJECT_PATH / "data" / "xss_payloads.txt", "r") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+XSS_PAYLOADS = load_payloads()
+# Все нагрузки ищутся одним проходом автомата, автомат строится один раз при импорте
+XSS_PAYLOAD_MATCHER = AhoCorasick(XSS_PAYLOADS)
+
 
-# Сигнатуры XSS с регулярными выражениями
+def has_payload(text: str) -> bool:
+    return next(XSS_PAYLOAD_MATCHER.iter_matches(text), None) is not None
+
+
+def get_script_text(text: str, script: ScriptElement, use_decoding: bool) -> str:
+    """
+    Скрипт вместе с тегами; HTMLParser не раскрывает сущности в теле скрипта, поэтому с use_decoding оно декодируется.
+    :param text: str. Разбираемый текст
+    :param script: ScriptElement. Скрипт из потокового разбора
+    :param use_decoding: bool. Декодировать скрипт
+    :returns: str. Текст скрипта
+    """
+    script_text = text[script.start : script.stop]
+    return decode_cache.decode(script_text).text if use_decoding else script_text
+
+
+# Сигнатуры XSS: исходные выражения с вложенными ленивыми квантификаторами (например, <script.*?>.*?</script>)
+# на подобранном тексте работают за квадратичное время, поэтому они разбиты на фрагменты между `.*?`
+# и ищутся за линейное время (utils/gap_pattern.py)
 XSS_REGEX_PATTERNS = [
-    r'<script.*?>.*?</script>',
-    r'on\w+\s*=\s*["\'].*?["\']',
-    r'<iframe.*?src=["\'].*?["\']',
-    r'<img.*?src=.*?onerror=.*?>',
-    r'<svg.*?onload=.*?>',
-    r'value\s*=\s*["\'].*?<.*?>["\']',
-    r'value\s*=\s*["\'].*?alert\(.*?\).*?["\']',
+    GapPattern(r"<script", r">", r"</script>"),  # <script.*?>.*?</script>
+    # on\w+\s*=\s*["'].*?["']: совпадение начинается с первого «on\w» в слове, остальные дают тот же конец
+    GapPattern(r"(?<!\w)(?>\w*?(?P<start>on\w))\w*+\s*+=\s*+[\"']", r"[\"']"),
+    GapPattern(r"<iframe", r"src=[\"']", r"[\"']"),  # <iframe.*?src=["'].*?["']
+    GapPattern(r"<img", r"src=", r"onerror=", r">"),  # <img.*?src=.*?onerror=.*?>
+    GapPattern(r"<svg", r"onload=", r">"),  # <svg.*?onload=.*?>
+    GapPattern(r"value\s*+=\s*+[\"']", r"<", r">[\"']"),  # value\s*=\s*["'].*?<.*?>["']
+    GapPattern(r"value\s*+=\s*+[\"']", r"alert\(", r"\)", r"[\"']"),  # value\s*=\s*["'].*?alert\(.*?\).*?["']
 ]
 
 
 class BanwordModel:
     """
-    Анализатор для поиска XSS уязвимостей в тексте. Использует BeautifulSoup для анализа HTML и регулярные выражения
+    Анализатор для поиска XSS уязвимостей в тексте. Использует потоковый разбор HTML и регулярные выражения
     для поиска вредоносных полезных нагрузок.
     """
     
     def input_score(self, text: str, vault: Vault) -> ModelResult:
-        metric, reasons = self.detect_xss(text, vault.use_regex_input, vault.use_payload_signature_input, vault.use_bs4_input)
+        metric, reasons = self.detect_xss(
+            text, vault.use_regex_input, vault.use_payload_signature_input, vault.use_bs4_input, vault.use_decoding
+        )
         reject_flg = metric > vault.max_allowed_xss_input
 
         model_output = ModelResult(
@@ -44,7 +72,9 @@ class BanwordModel:
         return model_output
 
     def output_score(self, text: str, vault: Vault) -> ModelResult:
-        metric, reasons = self.detect_xss(text, vault.use_regex_output, vault.use_payload_signature_output, vault.use_bs4_output)
+        metric, reasons = self.detect_xss(
+            text, vault.use_regex_output, vault.use_payload_signature_output, vault.use_bs4_output, vault.use_decoding
+        )
         reject_flg = metric > vault.max_allowed_xss_output
 
         model_output = ModelResult(
@@ -57,44 +87,83 @@ class BanwordModel:
         self, input_text: str,
         use_regex: bool,
         use_payload_signature: bool,
-        use_bs4: bool
+        use_bs4: bool,
+        use_decoding: bool = False
         ) -> Tuple[float, List[Reason]]:
         """
-        Определяет XSS уязвимости с использованием BeautifulSoup и строкового поиска.
+        Определяет XSS уязвимости с использованием разбора HTML и строкового поиска.
+        Разметка всегда разбирается по исходному тексту: раскрытая сущность вроде &quot; не должна закрывать атрибут.
+        С use_decoding декодированный текст (utils/xss_normalizer.py) используется только для поиска нагрузок
+        и сигнатур, а найденные в нем позиции переводятся обратно в позиции исходного текста.
+        """
+        vulnerabilities = []
+
+        # 1. Поиск нагрузок в скриптах и в значениях атрибута value.
+        # HTML разбирается, только если включена DOM-проверка и в тексте есть разметка: без "<" тегов быть не может
+        if (use_bs4 or use_payload_signature) and "<" in input_text:
+            vulnerabilities.extend(
+                self.detect_payloads_in_tags(input_text, use_bs4, use_payload_signature, use_decoding)
+            )
+
+        # 2. Поиск по декодированному тексту: скрипты, появившиеся только после декодирования, и сигнатуры
+        decoded = decode_cache.decode(input_text) if use_decoding else DecodedText(input_text)
+        vulnerabilities.extend(self.detect_in_decoded_text(decoded, use_regex, use_bs4))
+
+        # Убираем дубликаты. Reason не хэшируется, поэтому ключом служат позиции
+        vulnerabilities = list({(reason.start, reason.stop): reason for reason in vulnerabilities}.values())
+        return len(vulnerabilities), vulnerabilities
+
+    def detect_in_decoded_text(self, decoded: DecodedText, use_regex: bool, use_bs4: bool) -> List[Reason]:
+        """
+        Поиск регулярными выражениями и поиск нагрузок в скриптах декодированного текста.
+        Атрибуты декодированного текста не проверяются: их границы могли сместиться после декодирования.
+        :param decoded: DecodedText. Декодированный текст; без экранирования совпадает с исходным
+        :param use_regex: bool. Искать сигнатуры регулярными выражениями
+        :param use_bs4: bool. Искать нагрузки в скриптах, появившихся после декодирования
+        :returns: List[Reason]. Найденные уязвимости в позициях исходного текста
         """
+        text = decoded.text
         vulnerabilities = []
+        if use_bs4 and decoded.decoded_positions is not None and "<" in text:
+            vulnerabilities.extend(self.detect_payloads_in_tags(text, use_bs4=True, use_payload_signature=False))
 
-        # 1. Прямой парсинг HTML с помощью BeautifulSoup
-        soup = BeautifulSoup(input_text, "html.parser")
-
-        # Поиск скриптов и опасных событийных обработчиков
-        if use_bs4:
-            for script in soup.find_all('script'):
-                if any(xss_payload in str(script) for xss_payload in XSS_PAYLOADS):
-                    start = input_text.find(str(script))
-                    if start != -1:
-                        end = start + len(str(script))
-                        vulnerabilities.append(Reason(start=start, stop=end))
-
-        # Поиск опасных значений в атрибутах, таких как value
-        if use_payload_signature:
-            for tag in soup.find_all(True):  # Find all tags
-                for attribute in tag.attrs:
-                    if attribute == 'value':
-                        value = tag.attrs[attribute]
-                        if any(xss_payload in value for xss_payload in XSS_PAYLOADS):
-                            start = input_text.find(value)
-                            if start != -1:
-                                end = start + len(value)
-                                vulnerabilities.append(Reason(start=start, stop=end))
-
-        # 2. Поиск уязвимостей с помощью регулярных выражений
         if use_regex:
-            for pattern in XSS_REGEX_PATTERNS:
-                matches = re.finditer(pattern, input_text, re.IGNORECASE)
-                for match in matches:
-                    if "onload" in match.group(0) or "onerror" in match.group(0):
-                        vulnerabilities.append(Reason(start=match.start(), stop=match.end()))
-
-        vulnerabilities = list(set(vulnerabilities))  # Убираем дубликаты
-        return len(vulnerabilities), vulnerabilities
\ No newline at end of file
+            vulnerabilities.extend(self.detect_by_regex(text))
+
+        for reason in vulnerabilities:
+            reason.start, reason.stop = decoded.source_span(reason.start, reason.stop)
+        return vulnerabilities
+
+    @staticmethod
+    def detect_by_regex(input_text: str) -> List[Reason]:
+        vulnerabilities = []
+        for pattern in XSS_REGEX_PATTERNS:
+            for start, stop in pattern.iter_matches(input_text):
+                if "onload" in input_text[start:stop] or "onerror" in input_text[start:stop]:
+                    vulnerabilities.append(Reason(start=start, stop=stop))
+        return vulnerabilities
+
+    @staticmethod
+    def detect_payloads_in_tags(
+        input_text: str, use_bs4: bool, use_payload_signature: bool, use_decoding: bool = False
+    ) -> List[Reason]:
+        """
+        Поиск XSS-нагрузок по событиям потокового разбора HTML (utils/html_scanner.py), дерево не строится.
+        Нагрузка внутри <script>...</script> помечает весь скрипт вместе с тегами (use_bs4),
+        нагрузка в атрибуте value помечает значение атрибута в исходном тексте (use_payload_signature).
+        Автомат проходит только по телам скриптов и значениям value, каждый символ текста — не больше одного раза.
+        С use_decoding тело скрипта декодируется через decode_cache. Значение атрибута проверяется как есть:
+        HTMLParser уже раскрыл в нем сущности, и повторное декодирование превратило бы &amp;lt; в <.
+        """
+        vulnerabilities = []
+        for event in iter_html_events(input_text):
+            if isinstance(event, ScriptElement):
+                if use_bs4 and has_payload(get_script_text(input_text, event, use_decoding)):
+                    vulnerabilities.append(Reason(start=event.start, stop=event.stop))
+            elif use_payload_signature:
+                vulnerabilities.extend(
+                    Reason(start=attribute.start, stop=attribute.stop)
+                    for attribute in event.attrs
+                    if attribute.name == "value" and attribute.value and has_payload(attribute.value)
+                )
+        return vulnerabilities
@@ -0,0 +1,64 @@
+import re
+from typing import Iterator, Optional, Tuple
+
+
+class GapPattern:
+    """
+    Линейная по времени замена выражений вида `A.*?B.*?C` с re.IGNORECASE.
+    Фрагменты ищутся по очереди первым вхождением в пределах строки, без возврата: более позднее вхождение
+    фрагмента не может помочь найти следующий. Если для кандидата какой-то фрагмент не найден до конца строки,
+    он не найдется и для следующих кандидатов, чей первый фрагмент заканчивается на той же строке,
+    поэтому они отбрасываются без поиска. Каждый символ просматривается ограниченное число раз.
+    Фрагменты после первого не должны совпадать с переводом строки, а первый фрагмент не должен требовать
+    долгого возврата. Если в первом фрагменте есть группа start, совпадение начинается с нее.
+    """
+
+    def __init__(self, first: str, *segments: str):
+        self.first = re.compile(first, re.IGNORECASE)
+        self.segments = [re.compile(segment, re.IGNORECASE) for segment in segments]
+        self.has_start_group = "start" in self.first.groupindex
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Поиск непересекающихся совпадений, как re.finditer для исходного выражения.
+        :param text: str. Текст для поиска
+        :returns: Iterator[Tuple[int, int]]. Кортежи (начало, конец)
+        """
+        position = 0
+        line_end = -1
+        failed_line_end = -1
+        while True:
+            first_match = self.first.search(text, position)
+            if first_match is None:
+                return
+            # Конец строки ищется заново только после перехода на следующую строку
+            if first_match.end() > line_end:
+                line_end = get_line_end(text, first_match.end())
+
+            stop = None if line_end == failed_line_end else self.match_segments(text, first_match.end(), line_end)
+            if stop is None:
+                failed_line_end = line_end
+                position = first_match.start() + 1
+                continue
+            yield (first_match.start("start") if self.has_start_group else first_match.start()), stop
+            position = stop
+
+    def match_segments(self, text: str, position: int, line_end: int) -> Optional[int]:
+        """
+        Поиск фрагментов после первого по очереди первым вхождением до конца строки.
+        :param text: str. Текст для поиска
+        :param position: int. Конец совпадения первого фрагмента
+        :param line_end: int. Конец строки
+        :returns: int | None. Конец совпадения или None, если какой-то фрагмент не найден
+        """
+        for segment in self.segments:
+            segment_match = segment.search(text, position, line_end)
+            if segment_match is None:
+                return None
+            position = segment_match.end()
+        return position
+
+
+def get_line_end(text: str, position: int) -> int:
+    line_end = text.find("\n", position)
+    return len(text) if line_end == -1 else line_end
@@ -0,0 +1,124 @@
+from collections import deque
+from html.parser import HTMLParser, attrfind_tolerant, tagfind_tolerant
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# Размер куска, которым текст подается парсеру: необработанный остаток в парсере не превышает одного тега
+CHUNK_SIZE = 64 * 1024
+
+
+class Attribute(NamedTuple):
+    name: str
+    value: Optional[str]
+    start: int  # Позиции значения атрибута в исходном тексте без кавычек
+    stop: int
+
+
+class StartTag(NamedTuple):
+    name: str
+    attrs: List[Attribute]
+    start: int
+    stop: int
+
+
+class ScriptElement(NamedTuple):
+    start: int  # От начала открывающего до конца закрывающего тега
+    stop: int
+
+
+HtmlEvent = Union[StartTag, ScriptElement]
+
+
+def parse_attribute_spans(text: str, tag_start: int, tag_stop: int) -> List[Tuple[int, int]]:
+    """
+    Позиции значений атрибутов открывающего тега. Разбор повторяет HTMLParser.parse_starttag
+    теми же выражениями, поэтому позиции идут в том же порядке, что и атрибуты из handle_starttag.
+    :param text: str. Исходный текст
+    :param tag_start: int. Позиция "<" тега
+    :param tag_stop: int. Позиция после ">" тега
+    :returns: List[Tuple[int, int]]. Позиции значений без кавычек; для атрибута без значения — пустой диапазон
+    """
+    spans = []
+    position = tagfind_tolerant.match(text, tag_start + 1).end()
+    while position < tag_stop:
+        match = attrfind_tolerant.match(text, position, tag_stop)
+        if not match:
+            break
+        if match.group(2):
+            start, stop = match.span(3)
+            if stop - start >= 2 and text[start] == text[stop - 1] and text[start] in "'\"":
+                start, stop = start + 1, stop - 1
+        else:
+            start = stop = match.end(1)
+        spans.append((start, stop))
+        position = match.end()
+    return spans
+
+
+class HtmlEventScanner(HTMLParser):
+    """
+    Потоковый разбор HTML без построения дерева: открывающие теги с атрибутами и элементы <script>
+    выдаются событиями с точными позициями в исходном тексте.
+    """
+
+    def __init__(self, text: str):
+        super().__init__()
+        self.text = text
+        self.events: deque = deque()
+        self.script_start: Optional[int] = None
+        # Номер и начало последней строки, до которой дошел перевод позиций getpos() в смещения
+        self.line = 1
+        self.line_start = 0
+
+    def get_offset(self) -> int:
+        line, column = self.getpos()
+        while self.line < line:
+            self.line_start = self.text.index("\n", self.line_start) + 1
+            self.line += 1
+        return self.line_start + column
+
+    def get_start_tag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> StartTag:
+        start = self.get_offset()
+        stop = start + len(self.get_starttag_text())
+        # HTMLParser уже раскрыл сущности в значениях атрибутов, позиции указывают на исходный текст
+        spans = parse_attribute_spans(self.text, start, stop)
+        attributes = [Attribute(name, value, *span) for (name, value), span in zip(attrs, spans)]
+        return StartTag(tag, attributes, start, stop)
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        start_tag = self.get_start_tag(tag, attrs)
+        self.events.append(start_tag)
+        if tag == "script":
+            self.script_start = start_tag.start
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        # <script/> не открывает скрипт, поэтому событие только одно
+        self.events.append(self.get_start_tag(tag, attrs))
+
+    def handle_endtag(self, tag: str):
+        if tag == "script" and self.script_start is not None:
+            start = self.get_offset()
+            self.events.append(ScriptElement(self.script_start, self.text.index(">", start) + 1))
+            self.script_start = None
+
+    def close(self):
+        super().close()
+        if self.script_start is not None:
+            self.events.append(ScriptElement(self.script_start, len(self.text)))
+            self.script_start = None
+
+
+def iter_html_events(text: str) -> Iterator[HtmlEvent]:
+    """
+    События разбора HTML с точными позициями. Текст подается парсеру кусками,
+    события отдаются по мере разбора, поэтому память не зависит от размера документа.
+    :param text: str. Исходный текст
+    :returns: Iterator[HtmlEvent]. Открывающие теги и элементы <script> в порядке появления
+    """
+    scanner = HtmlEventScanner(text)
+    for chunk_start in range(0, len(text), CHUNK_SIZE):
+        scanner.feed(text[chunk_start : chunk_start + CHUNK_SIZE])
+        while scanner.events:
+            yield scanner.events.popleft()
+    scanner.close()
+    while scanner.events:
+        yield scanner.events.popleft()
@@ -0,0 +1,104 @@
+import re
+from array import array
+from bisect import bisect_right
+from html.entities import html5
+from typing import NamedTuple, Optional, Tuple
+
+# HTML-сущности, percent-encoding и JS-экранирование разбираются одним выражением за один проход.
+# Именованные сущности без точки с запятой распознаются только для символов разметки, как &lt в старом HTML
+ESCAPE_PATTERN = re.compile(
+    r"""
+    &\#[xX](?P<entity_hex>[0-9a-fA-F]{1,6});?
+    |&\#(?P<entity_decimal>[0-9]{1,7});?
+    |(?P<entity_named>&(?:[a-zA-Z][a-zA-Z0-9]{1,31};|(?:lt|gt|amp|quot)(?![a-zA-Z0-9;])))
+    |%u(?P<percent_unicode>[0-9a-fA-F]{4})
+    |%(?P<percent>[0-9a-fA-F]{2})
+    |\\u\{(?P<js_code_point>[0-9a-fA-F]{1,6})\}
+    |\\u(?P<js_unicode>[0-9a-fA-F]{4})
+    |\\x(?P<js_hex>[0-9a-fA-F]{2})
+    """,
+    re.VERBOSE,
+)
+
+ESCAPE_CHARS = ("&", "%", "\\")
+
+
+class DecodedText(NamedTuple):
+    text: str
+    # Опорные точки карты позиций: на четных местах начинаются неизмененные участки, на нечетных —
+    # декодированные символы. None, если декодировать было нечего и текст совпадает с исходным
+    decoded_positions: Optional[array] = None
+    source_positions: Optional[array] = None
+
+    def source_span(self, start: int, stop: int) -> Tuple[int, int]:
+        """
+        Перевод позиций декодированного текста в позиции исходного.
+        :param start: int. Начало в декодированном тексте
+        :param stop: int. Конец в декодированном тексте
+        :returns: Tuple[int, int]. Начало и конец в исходном тексте; экранированный символ попадает целиком
+        """
+        if self.decoded_positions is None or stop <= start:
+            return start, stop
+        anchor = bisect_right(self.decoded_positions, start) - 1
+        source_start = self.source_positions[anchor]
+        if anchor % 2 == 0:
+            source_start += start - self.decoded_positions[anchor]
+
+        # Конец определяется по последнему символу совпадения: у экранированного символа это конец экранирования
+        anchor = bisect_right(self.decoded_positions, stop - 1) - 1
+        if anchor % 2 == 0:
+            source_stop = self.source_positions[anchor] + stop - self.decoded_positions[anchor]
+        else:
+            source_stop = self.source_positions[anchor + 1]
+        return source_start, source_stop
+
+
+def decode_escape(match: re.Match) -> Optional[str]:
+    """
+    Декодирование одного экранированного символа.
+    :param match: re.Match. Совпадение ESCAPE_PATTERN
+    :returns: Optional[str]. Символ или None, если экранирование некорректно и остается как есть
+    """
+    group = match.lastgroup
+    if group == "entity_named":
+        return html5.get(match.group()[1:])
+    code_point = int(match.group(group), 10 if group == "entity_decimal" else 16)
+    if code_point > 0x10FFFF or 0xD800 <= code_point <= 0xDFFF:
+        return None
+    return chr(code_point)
+
+
+def has_escapes(text: str) -> bool:
+    # Поиск подстроки намного быстрее поиска по выражению, а большинство текстов не содержит ни одного из символов
+    return any(char in text for char in ESCAPE_CHARS) and ESCAPE_PATTERN.search(text) is not None
+
+
+def decode_text(text: str) -> DecodedText:
+    """
+    Декодирование HTML-сущностей (&#x3C;, &#60;, &lt;), percent-encoding (%3C, %u003C)
+    и JS-экранирования (\\x3c, \\u003c, \\u{3c}) за один проход с картой позиций в исходный текст.
+    Раскрывается один слой: результат повторно не декодируется.
+    :param text: str. Исходный текст
+    :returns: DecodedText. Декодированный текст и карта позиций
+    """
+    chunks = []
+    decoded_positions, source_positions = array("I", [0]), array("I", [0])
+    decoded_length = 0
+    position = 0
+    for match in ESCAPE_PATTERN.finditer(text):
+        decoded = decode_escape(match)
+        if decoded is None:
+            continue
+        chunks.append(text[position : match.start()])
+        decoded_length += match.start() - position
+        decoded_positions.append(decoded_length)
+        source_positions.append(match.start())
+        chunks.append(decoded)
+        decoded_length += len(decoded)
+        decoded_positions.append(decoded_length)
+        source_positions.append(match.end())
+        position = match.end()
+    if not chunks:
+        return DecodedText(text)
+    chunks.append(text[position:])
+    return DecodedText("".join(chunks), decoded_positions, source_positions)
@@ -0,0 +1,18 @@
+import os
+import sys
+from pathlib import Path
+
+# Модули сервиса импортируются из директории app, как при запуске main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+# Настройки, без которых не загружается конфигурация; тестам нужны только модули анализатора
+for name, value in {
+    "ADMIN_API_KEY": "test",
+    "ALERTING_ENDPOINT": "http://127.0.0.1:9/alert",
+    "CLICKHOUSE_HOST": "127.0.0.1",
+    "CLICKHOUSE_PORT": "9",
+    "CLICKHOUSE_DB": "default",
+    "CLICKHOUSE_USER": "default",
+    "CLICKHOUSE_PASSWORD": "",
+}.items():
+    os.environ.setdefault(name, value)
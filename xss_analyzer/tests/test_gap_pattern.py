@@ -0,0 +1,80 @@
+import random
+import re
+import time
+
+import pytest
+from services.model import XSS_REGEX_PATTERNS
+from utils.gap_pattern import GapPattern
+
+# Исходные выражения, которые заменяют XSS_REGEX_PATTERNS, в том же порядке
+ORIGINAL_REGEXES = [
+    r"<script.*?>.*?</script>",
+    r"on\w+\s*=\s*[\"'].*?[\"']",
+    r"<iframe.*?src=[\"'].*?[\"']",
+    r"<img.*?src=.*?onerror=.*?>",
+    r"<svg.*?onload=.*?>",
+    r"value\s*=\s*[\"'].*?<.*?>[\"']",
+    r"value\s*=\s*[\"'].*?alert\(.*?\).*?[\"']",
+]
+PATTERNS = list(zip(XSS_REGEX_PATTERNS, ORIGINAL_REGEXES))
+
+FRAGMENTS = [
+    "<script", "</script>", "<SCRIPT", ">", "<", "'", '"', "=", " = ", "on", "onload", "ONERROR", "onx", "xon",
+    "<iframe", "src=", "src='", "<img", "onerror=", "<svg", "onload=", "value", "value=", "VALUE = '", "alert(",
+    ")", "\n", " ", "a", "1", "_",
+]  # fmt: skip
+
+
+# Незавершенные фрагменты на одной строке и их продолжения на следующей: исходные выражения не переходят
+# через перевод строки, поэтому продолжение не должно давать совпадения
+UNFINISHED_LINE = "<script <iframe src=' <img src= <svg value='< alert( onx=' onxonx"
+MULTILINE_TEXTS = {
+    "unfinished": UNFINISHED_LINE + "\n",
+    "continued": UNFINISHED_LINE + "\n> </script> ' onerror= > onload= > >' ) '\n",
+    "long_line": "<script <img src= <svg value='" * 30 + "\n>alert(1) onerror=onload=</script>' >\n",
+    "split_tags": "\n".join(["<script", ">", "</script>", "value='<", ">'", "<img src=", "onerror=", ">"]) + "\n",
+}
+
+
+def test_every_pattern_has_original_regex():
+    assert len(XSS_REGEX_PATTERNS) == len(ORIGINAL_REGEXES)
+
+
+def random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 40)))
+
+
+@pytest.mark.parametrize("gap_pattern, regex", PATTERNS)
+def test_matches_equal_regex(gap_pattern: GapPattern, regex: str):
+    rng = random.Random(regex)
+    compiled = re.compile(regex, re.IGNORECASE)
+    for _ in range(3000):
+        text = random_text(rng)
+        expected = [match.span() for match in compiled.finditer(text)]
+        assert list(gap_pattern.iter_matches(text)) == expected, text
+
+
+@pytest.mark.parametrize("gap_pattern, regex", PATTERNS)
+def test_linear_time_on_repeated_fragments(gap_pattern: GapPattern, regex: str):
+    # Фрагменты без завершения, на которых исходные выражения возвращаются квадратично
+    text = "<script <iframe src=' <img src= <svg value='< alert( onx=' onxonx" * (1024 * 1024 // 68)
+    started = time.perf_counter()
+    list(gap_pattern.iter_matches(text))
+    assert time.perf_counter() - started < 2
+
+
+@pytest.mark.parametrize("text", MULTILINE_TEXTS.values(), ids=MULTILINE_TEXTS.keys())
+@pytest.mark.parametrize("gap_pattern, regex", PATTERNS)
+def test_matches_equal_regex_on_multiline_text(gap_pattern: GapPattern, regex: str, text: str):
+    text *= 5
+    expected = [match.span() for match in re.finditer(regex, text, re.IGNORECASE)]
+    assert list(gap_pattern.iter_matches(text)) == expected
+
+
+@pytest.mark.parametrize("text", MULTILINE_TEXTS.values(), ids=MULTILINE_TEXTS.keys())
+@pytest.mark.parametrize("gap_pattern, regex", PATTERNS)
+def test_linear_time_on_multiline_text(gap_pattern: GapPattern, regex: str, text: str):
+    text *= 1024 * 1024 // len(text)
+    started = time.perf_counter()
+    list(gap_pattern.iter_matches(text))
+    assert time.perf_counter() - started < 2
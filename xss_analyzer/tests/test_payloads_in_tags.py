@@ -0,0 +1,25 @@
+import pytest
+from services.model import BanwordModel
+
+PAYLOAD = "<img src=x onerror=alert(1)>"
+
+
+def find_payloads(text: str):
+    return BanwordModel.detect_payloads_in_tags(text, use_bs4=True, use_payload_signature=True, use_decoding=True)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '<input value="&lt;img src=x onerror=alert(1)&gt;">',
+        f'<input value="{PAYLOAD}">',
+        "<script>%3Cscript%3Ealert(1)%3C/script%3E</script>",
+    ],
+)
+def test_finds_encoded_payload(text: str):
+    assert find_payloads(text)
+
+
+def test_attribute_value_is_decoded_once():
+    # HTMLParser уже раскрыл &amp; в значении: после него остается текст &lt;img ...&gt;, а не тег
+    assert find_payloads('<input value="&amp;lt;img src=x onerror=alert(1)&amp;gt;">') == []